@@ -7,11 +7,24 @@
 
 
 
+import argparse
+import atexit
+import os
 from gtp_connection import GtpConnection
 from board_base import DEFAULT_SIZE, GO_POINT, GO_COLOR
-from board import GoBoard
+from board import GoBoard, DEFAULT_TT_ENTRIES
 from board_util import GoBoardUtil
 from engine import GoEngine
+from solved_db import SolvedDatabase
+from opening_book import BOOK_DIR
+from outcome_table import TABLE_DIR
+from regions import region_values
+from ponder import Ponderer
+from distributed_solver import DistributedSolver
+from budget import CHECKPOINT_INTERVAL
+from heuristic_search import HEURISTIC_SHARE
+from hard_deadline import DeadlineSolver
+from move_order import MOVE_ORDERS
 
 
 class Go0:
@@ -40,10 +53,215 @@ def run() -> None:
     """
     start the gtp connection and wait for commands.
     """
+    args = parse_args()
     board: GoBoard = GoBoard(DEFAULT_SIZE)
+    board.tt_entries = args.tt_entries
+    board.table.maxEntries = args.tt_entries
+    board.max_nodes = args.max_nodes
+    board.max_memory_mb = args.max_memory
+    board.use_regions = not args.no_regions
+    board.use_safe_moves = args.safe_moves
+    board.use_symmetry = not args.no_symmetry
+    board.use_tempo = not args.no_tempo
+    board.iterative = not args.recursive
+    board.use_etc = args.etc
+    board.move_order = args.move_order
+    board.timing = args.solve_timing
+    if args.region_cache:
+        if os.path.isfile(args.region_cache):
+            region_values.load(args.region_cache)
+        atexit.register(region_values.save, args.region_cache)
+    if args.solved_db:
+        board.solved_db = SolvedDatabase(args.solved_db, readonly=args.solved_db_readonly)
     con: GtpConnection = GtpConnection(Go0(), board)
+    con.workers = args.workers
+    if args.serve:
+        con.distributed = DistributedSolver(args.serve, args.workers)
+        atexit.register(con.distributed.close)
+    elif args.hard_deadline is not None:
+        con.deadline_solver = DeadlineSolver(args.hard_deadline)
+        atexit.register(con.deadline_solver.close)
+    con.book_dir = None if args.no_book else args.book_dir
+    con.table_dir = None if args.no_tables else args.table_dir
+    con.solve_log = args.solve_log
+    con.checkpoint_path = args.checkpoint
+    con.checkpoint_interval = args.checkpoint_interval
+    con.heuristic_share = args.heuristic_share
+    if args.ponder:
+        con.ponderer = Ponderer()
     con.start_connection()
 
 
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the arguments of the program.
+    """
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "--solved-db",
+        type=str,
+        default=None,
+        help="file of proven positions, consulted and extended by the solver",
+    )
+    parser.add_argument(
+        "--solved-db-readonly",
+        action="store_true",
+        default=False,
+        help="only read the solved-position database, never append to it",
+    )
+    parser.add_argument(
+        "--tt-entries",
+        type=int,
+        default=DEFAULT_TT_ENTRIES,
+        help="maximum number of positions kept in the transposition table between commands",
+    )
+    parser.add_argument(
+        "--max-nodes",
+        type=int,
+        default=None,
+        help="stop each solve after this many nodes",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=int,
+        default=None,
+        help="stop each solve when the process grows by more than this many MB during it",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes for solve and genmove, 1 solves without a process pool",
+    )
+    parser.add_argument(
+        "--serve",
+        type=str,
+        default=None,
+        help="solve with workers connecting to host:port or unix:PATH, "
+             "--workers of them started here, see distributed_solver.py",
+    )
+    parser.add_argument(
+        "--hard-deadline",
+        type=float,
+        default=None,
+        metavar="MARGIN",
+        help="solve in a worker process that is killed MARGIN seconds after the time limit, "
+             "with its memory capped by --max-memory, see hard_deadline.py",
+    )
+    parser.add_argument(
+        "--ponder",
+        action="store_true",
+        default=False,
+        help="keep solving the current position while waiting for the next command",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="save the progress of a solve to this file every checkpoint interval, "
+        "see solve_resume",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=CHECKPOINT_INTERVAL,
+        help="seconds between two checkpoints of a solve",
+    )
+    parser.add_argument(
+        "--heuristic-share",
+        type=float,
+        default=HEURISTIC_SHARE,
+        help="share of the genmove time kept for a heuristic search if the solve "
+             "runs out of time; the search also gets the time a solve stopped early leaves",
+    )
+    parser.add_argument(
+        "--book-dir",
+        type=str,
+        default=BOOK_DIR,
+        help="directory of the opening books book<size>.bin",
+    )
+    parser.add_argument(
+        "--no-book",
+        action="store_true",
+        default=False,
+        help="do not use opening books",
+    )
+    parser.add_argument(
+        "--table-dir",
+        type=str,
+        default=TABLE_DIR,
+        help="directory of the outcome tables outcomes<size>.bin of small boards",
+    )
+    parser.add_argument(
+        "--no-tables",
+        action="store_true",
+        default=False,
+        help="do not use outcome tables",
+    )
+    parser.add_argument(
+        "--no-regions",
+        action="store_true",
+        default=False,
+        help="do not solve endgames as sums of independent regions",
+    )
+    parser.add_argument(
+        "--safe-moves",
+        action="store_true",
+        default=False,
+        help="end the search where counting safe moves decides the game",
+    )
+    parser.add_argument(
+        "--no-symmetry",
+        action="store_true",
+        default=False,
+        help="search all moves of symmetric positions, not one of each symmetric set",
+    )
+    parser.add_argument(
+        "--no-tempo",
+        action="store_true",
+        default=False,
+        help="search every eye fill, not one of each set of equivalent ones",
+    )
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        default=False,
+        help="use the recursive search instead of the iterative one",
+    )
+    parser.add_argument(
+        "--etc",
+        action="store_true",
+        default=False,
+        help="look up all children in the transposition table before searching a position",
+    )
+    parser.add_argument(
+        "--move-order",
+        choices=MOVE_ORDERS,
+        default="array",
+        help="order of the moves of the search, see move_order.py",
+    )
+    parser.add_argument(
+        "--solve-log",
+        type=str,
+        default=None,
+        help="append the counters of every solve to this file as JSON lines",
+    )
+    parser.add_argument(
+        "--solve-timing",
+        action="store_true",
+        default=False,
+        help="measure the time spent in is_legal and hashing, slows the solver",
+    )
+    parser.add_argument(
+        "--region-cache",
+        type=str,
+        default=None,
+        help="file of region values, read at start and written at exit",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
     run()
@@ -0,0 +1,446 @@
+"""
+benchmark.py
+Benchmark corpus and regression runner of the solver.
+
+A corpus is a GTP regression file like a2_public_*.gtp: each position is
+set up with boardsize, clear_board and play commands, followed by a
+solve command and its expected answers, #?[w d4|w c4] for a win with any
+of the listed moves, #?[b] for a loss of the player to move, or
+#?[unknown] if the result is not known. benchmark_corpus.gtp holds
+positions of 4x4 to 7x7 boards with different numbers of empty points,
+generated and proven by the corpus command.
+
+The runner solves each position with a fixed budget, either through
+GoBoard.solve or by sending the commands to a Go0.py process, and records
+its answer, status (ok, wrong, unknown, or unverified if the expected
+result is unknown), time and nodes. Each position starts with an empty
+transposition table and region cache. Results are written as CSV or JSON
+and can be compared with a saved baseline: a position that is no longer
+solved correctly, or that takes much longer, is a regression.
+Both drivers solve with the same time limit. The GTP timelimit command
+only takes whole seconds, so the GTP driver refuses other limits.
+
+Usage as a tool:
+    python3 benchmark.py run --out baseline.json
+    python3 benchmark.py run --driver gtp --timelimit 5 --out results.csv
+    python3 benchmark.py run a2_public_easy.gtp --baseline baseline.json
+    python3 benchmark.py run --move-order pattern --baseline baseline.json
+    python3 benchmark.py compare baseline.json results.json
+    python3 benchmark.py corpus --out benchmark_corpus.gtp
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from board_base import BLACK, WHITE, GO_POINT, format_point, opponent, parse_point
+from board import GoBoard
+from board_util import GoBoardUtil
+from move_order import MOVE_ORDERS
+from regions import region_values
+
+"""
+Default corpus, next to this file.
+"""
+CORPUS: str = os.path.join(os.path.dirname(os.path.realpath(__file__)), "benchmark_corpus.gtp")
+
+"""
+A position is a time regression if it takes more than SLOWDOWN times
+its baseline time, and at least MIN_SLOWDOWN_SECONDS longer.
+"""
+SLOWDOWN: float = 1.5
+MIN_SLOWDOWN_SECONDS: float = 0.2
+
+FIELDS = ["name", "size", "empty", "expected", "answer", "status", "time", "nodes"]
+
+
+class Position(object):
+    def __init__(self, name: str, size: int, moves: List[Tuple[str, str]],
+                 timelimit: float, expected: List[str]) -> None:
+        """
+        name: file and command id
+        moves: (color, point) as in GTP play commands
+        expected: the correct answers, or ["unknown"]
+        """
+        self.name = name
+        self.size = size
+        self.moves = moves
+        self.timelimit = timelimit
+        self.expected = expected
+
+    def board(self) -> GoBoard:
+        board = GoBoard(self.size)
+        for color, point in self.moves:
+            board.play_move(parse_point(point, self.size), BLACK if color == "b" else WHITE)
+        return board
+
+
+def read_corpus(path: str) -> List[Position]:
+    """
+    The solved positions of a GTP regression file
+    """
+    positions = []
+    size = 7
+    moves: List[Tuple[str, str]] = []
+    timelimit = 1.0
+    pending: Optional[Position] = None
+    with open(path) as f:
+        lines = f.read().splitlines()
+    for line in lines:
+        words = line.split()
+        if not words:
+            continue
+        if words[0].startswith("#?"):
+            if pending is not None:
+                pending.expected = [a.strip().lower() for a in
+                                    line.strip()[3:-1].split("|")]
+                positions.append(pending)
+                pending = None
+            continue
+        if words[0].startswith("#"):
+            continue
+        number = ""
+        if words[0].isdigit():
+            number = words[0]
+            words = words[1:]
+        command = words[0]
+        if command == "boardsize":
+            size = int(words[1])
+            moves = []
+        elif command == "clear_board":
+            moves = []
+        elif command == "timelimit":
+            timelimit = float(words[1])
+        elif command == "play":
+            moves.append((words[1].lower(), words[2].lower()))
+        elif command == "solve":
+            name = "{}:{}".format(os.path.basename(path), number)
+            pending = Position(name, size, list(moves), timelimit, ["unknown"])
+    return positions
+
+
+def status(expected: List[str], answer: str) -> str:
+    if expected == ["unknown"]:
+        return "unknown" if answer == "unknown" else "unverified"
+    if answer == "unknown":
+        return "unknown"
+    return "ok" if answer in expected else "wrong"
+
+
+class ApiDriver(object):
+    """
+    Solves positions with GoBoard.solve in this process
+    """
+    def __init__(self, max_nodes: Optional[int], move_order: str = "array") -> None:
+        self.max_nodes = max_nodes
+        self.move_order = move_order
+
+    def solve(self, position: Position, timelimit: float) -> Tuple[str, float, int]:
+        """
+        (answer, seconds, nodes)
+        """
+        board = position.board()
+        board.max_nodes = self.max_nodes
+        board.move_order = self.move_order
+        region_values.clear()
+        color = board.current_player
+        start = time.time()
+        win, time_ended, move = board.solve(color, timelimit)
+        elapsed = time.time() - start
+        letter = "b" if color == BLACK else "w"
+        if time_ended:
+            answer = "unknown"
+        elif win:
+            answer = "{} {}".format(letter, format_point(move, position.size))
+        else:
+            answer = "w" if letter == "b" else "b"
+        return answer, elapsed, board.budget.nodes
+
+    def close(self) -> None:
+        pass
+
+
+def gtp_timelimit(timelimit: float) -> int:
+    """
+    timelimit as the argument of the GTP timelimit command,
+    ValueError if the command cannot express it
+    """
+    if timelimit < 1 or timelimit != int(timelimit):
+        raise ValueError("the GTP driver needs a whole number of seconds, not {}".format(timelimit))
+    return int(timelimit)
+
+
+class GtpDriver(object):
+    """
+    Solves positions with the solve command of a Go0.py process
+    """
+    def __init__(self, command: List[str]) -> None:
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True, bufsize=1)
+
+    def send(self, command: str) -> None:
+        self.process.stdin.write(command + "\n")
+        self.process.stdin.flush()
+
+    def response(self) -> str:
+        """
+        The next response, skipping any other output of the engine
+        """
+        line = self.process.stdout.readline()
+        while line and line[0] not in "=?":
+            line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("the engine exited")
+        lines = [line[1:].strip()]
+        line = self.process.stdout.readline()
+        while line.strip():
+            lines.append(line.strip())
+            line = self.process.stdout.readline()
+        return "\n".join(lines).strip()
+
+    def solve(self, position: Position, timelimit: float) -> Tuple[str, float, int]:
+        commands = ["boardsize {}".format(position.size), "clear_board",
+                    "timelimit {}".format(gtp_timelimit(timelimit))]
+        commands += ["play {} {}".format(color, point) for color, point in position.moves]
+        for command in commands:
+            self.send(command)
+            self.response()
+        start = time.time()
+        self.send("solve")
+        self.send("solve_stats")
+        answers = []
+        stats = self.response()
+        # everything before the stats answers solve
+        while not stats.startswith("size "):
+            answers.append(stats)
+            stats = self.response()
+        elapsed = time.time() - start
+        counters = dict(line.split(" ", 1) for line in stats.splitlines())
+        answer = answers[0] if answers else "unknown"
+        return answer, elapsed, int(counters["nodes"])
+
+    def close(self) -> None:
+        self.send("quit")
+        self.process.wait()
+
+
+def run(positions: List[Position], driver, timelimit: Optional[float]) -> List[Dict[str, Any]]:
+    """
+    Solve every position, with timelimit or the time limit of its file
+    """
+    results = []
+    for position in positions:
+        limit = timelimit if timelimit is not None else position.timelimit
+        answer, seconds, nodes = driver.solve(position, limit)
+        result = {"name": position.name, "size": position.size,
+                  "empty": position.size * position.size - len(position.moves),
+                  "expected": "|".join(position.expected), "answer": answer,
+                  "status": status(position.expected, answer),
+                  "time": round(seconds, 4), "nodes": nodes}
+        print("{name} {size}x{size} {empty} empty: {answer} ({status}) "
+              "{time:.2f}s {nodes} nodes".format(**result), flush=True)
+        results.append(result)
+    return results
+
+
+def write_results(results: List[Dict[str, Any]], path: str) -> None:
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=1)
+
+
+def read_results(path: str) -> List[Dict[str, Any]]:
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            row["size"] = int(row["size"])
+            row["empty"] = int(row["empty"])
+            row["time"] = float(row["time"])
+            row["nodes"] = int(row["nodes"])
+        return rows
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> int:
+    """
+    Print the differences to baseline. Returns the number of regressions.
+    """
+    old = {r["name"]: r for r in baseline}
+    regressions = 0
+    base_time = new_time = 0.0
+    base_nodes = new_nodes = 0
+    for r in results:
+        b = old.get(r["name"])
+        if b is None:
+            continue
+        base_time += b["time"]
+        new_time += r["time"]
+        base_nodes += b["nodes"]
+        new_nodes += r["nodes"]
+        problem = None
+        if b["status"] == "ok" and r["status"] != "ok":
+            problem = "was ok, now {}".format(r["status"])
+        elif r["status"] == "wrong" and b["status"] != "wrong":
+            problem = "wrong answer {}".format(r["answer"])
+        elif r["time"] > SLOWDOWN * b["time"] and r["time"] - b["time"] > MIN_SLOWDOWN_SECONDS:
+            problem = "{:.2f}s, was {:.2f}s".format(r["time"], b["time"])
+        if problem is not None:
+            regressions += 1
+            print("REGRESSION {}: {}".format(r["name"], problem))
+    if base_time > 0 and base_nodes > 0:
+        print("time {:.2f}s -> {:.2f}s ({:+.1f}%), nodes {} -> {} ({:+.1f}%)".format(
+            base_time, new_time, 100.0 * (new_time / base_time - 1),
+            base_nodes, new_nodes, 100.0 * (new_nodes / base_nodes - 1)))
+    return regressions
+
+
+def summarize(results: List[Dict[str, Any]]) -> None:
+    counts: Dict[str, int] = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    print("{} positions, {}, {:.2f}s, {} nodes".format(
+        len(results), ", ".join("{} {}".format(n, s) for s, n in sorted(counts.items())),
+        sum(r["time"] for r in results), sum(r["nodes"] for r in results)))
+
+
+def winning_moves(board: GoBoard, timelimit: float) -> Optional[List[GO_POINT]]:
+    """
+    All winning moves of the player to move, or None if a solve runs
+    out of time
+    """
+    color = board.current_player
+    moves = []
+    for move in GoBoardUtil.generate_legal_moves(board, color):
+        child = board.copy()
+        child.play_move(move, color)
+        win, time_ended, _ = child.solve(opponent(color), timelimit)
+        if time_ended:
+            return None
+        if not win:
+            moves.append(move)
+    return moves
+
+
+def make_corpus(specs: List[Tuple[int, int, int]], count: int, timelimit: float,
+                seed: int, path: str) -> int:
+    """
+    Write count proven positions for each (size, fewest, most empty points)
+    of specs to path. Returns the number of positions.
+    """
+    rng = random.Random(seed)
+    number = 0
+    with open(path, "w") as f:
+        f.write("# solver benchmark corpus, written by benchmark.py corpus\n")
+        f.write("# seed {} timelimit {}\n\n".format(seed, timelimit))
+        for size, fewest, most in specs:
+            made = 0
+            while made < count:
+                board = GoBoard(size)
+                played = []
+                target = rng.randint(fewest, most)
+                while len(board.get_empty_points()) > target:
+                    color = board.current_player
+                    legal = GoBoardUtil.generate_legal_moves(board, color)
+                    if not legal:
+                        break
+                    move = rng.choice(legal)
+                    board.play_move(move, color)
+                    played.append(("b" if color == BLACK else "w", format_point(move, size)))
+                if len(board.get_empty_points()) > target:
+                    continue
+                moves = winning_moves(board, timelimit)
+                if moves is None:
+                    continue
+                letter = "b" if board.current_player == BLACK else "w"
+                if moves:
+                    expected = "|".join("{} {}".format(letter, format_point(m, size))
+                                        for m in sorted(moves))
+                else:
+                    expected = "w" if letter == "b" else "b"
+                number += 1
+                made += 1
+                f.write("boardsize {}\nclear_board\ntimelimit {}\n".format(size, int(timelimit)))
+                for color, point in played:
+                    f.write("play {} {}\n".format(color, point))
+                f.write("{} solve\n#?[{}]\n\n".format(10 * number, expected))
+                f.flush()
+    return number
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the NoGo solver",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("run")
+    bench.add_argument("files", nargs="*", default=[CORPUS], help="GTP regression files")
+    bench.add_argument("--driver", choices=["api", "gtp"], default="api",
+                       help="solve with GoBoard.solve or the GTP solve command")
+    bench.add_argument("--engine", type=str, default="python3 Go0.py",
+                       help="command of the GTP engine")
+    bench.add_argument("--timelimit", type=float, default=None,
+                       help="seconds per position, default the time limit of the file")
+    bench.add_argument("--max-nodes", type=int, default=None, help="nodes per position")
+    bench.add_argument("--move-order", choices=MOVE_ORDERS, default="array",
+                       help="order of the moves of the search, see move_order.py")
+    bench.add_argument("--out", type=str, default=None, help="results file, .csv or .json")
+    bench.add_argument("--baseline", type=str, default=None, help="results to compare with")
+    diff = sub.add_parser("compare")
+    diff.add_argument("baseline")
+    diff.add_argument("results")
+    corpus = sub.add_parser("corpus")
+    corpus.add_argument("--count", type=int, default=6, help="positions per board size")
+    corpus.add_argument("--timelimit", type=float, default=20, help="seconds per proof")
+    corpus.add_argument("--seed", type=int, default=455)
+    corpus.add_argument("--out", type=str, default=CORPUS)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        positions = [p for path in args.files for p in read_corpus(path)]
+        if args.driver == "gtp":
+            for position in positions:
+                try:
+                    gtp_timelimit(args.timelimit if args.timelimit is not None
+                                  else position.timelimit)
+                except ValueError as error:
+                    parser.error("{}: {}".format(position.name, error))
+            engine = args.engine.split()
+            if args.max_nodes is not None:
+                engine += ["--max-nodes", str(args.max_nodes)]
+            engine += ["--move-order", args.move_order]
+            driver = GtpDriver(engine)
+        else:
+            driver = ApiDriver(args.max_nodes, args.move_order)
+        try:
+            results = run(positions, driver, args.timelimit)
+        finally:
+            driver.close()
+        summarize(results)
+        if args.out:
+            write_results(results, args.out)
+        if args.baseline:
+            if compare(read_results(args.baseline), results):
+                sys.exit(1)
+    elif args.command == "compare":
+        if compare(read_results(args.baseline), read_results(args.results)):
+            sys.exit(1)
+    else:
+        specs = [(4, 4, 10), (5, 8, 16), (6, 10, 18), (7, 10, 16), (7, 17, 22)]
+        count = make_corpus(specs, args.count, args.timelimit, args.seed, args.out)
+        print("{}: {} positions".format(args.out, count))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
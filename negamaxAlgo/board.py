@@ -12,9 +12,10 @@ Implements a basic Go board with functions to:
 The board uses a 1-dimensional representation with padding
 """
 
+import itertools
 import numpy as np
+from functools import lru_cache
 from typing import List, Tuple
-import time
 from board_base import (
     board_array_size,
     coord_to_point,
@@ -31,7 +32,59 @@ from board_base import (
     GO_COLOR,
     GO_POINT,
     PASS,
+    ZOBRIST,
+    TOPLAY_KEY,
 )
+from budget import ABORTED, CHECKPOINT_INTERVAL, SearchBudget
+from symmetry import permutations
+from regions import REGION_MIN_MOVES, solve_by_regions
+from safe_moves import counting_result
+from move_order import (
+    HISTORY_ORDERS,
+    PATTERN_DELTA,
+    order_moves,
+    pattern_cells,
+    pattern_codes,
+)
+from solve_stats import SolveStats
+
+"""
+Default bound on the number of positions in the session
+transposition table kept between GTP commands.
+"""
+DEFAULT_TT_ENTRIES: int = 2000000
+
+"""
+Results of positions at most this many moves below the root of a solve
+go to the solved-position database, deeper ones only to the
+transposition table.
+"""
+SOLVED_DB_DEPTH: int = 4
+
+"""
+Share of the time of solveAll given to its first round, split evenly
+over the moves. Each later round doubles the time per unknown move.
+"""
+SOLVE_ALL_FIRST_SHARE: float = 0.125
+
+
+@lru_cache(maxsize=None)
+def symmetry_keys(size: int) -> Tuple[List[List[GO_POINT]], List[List[int]], int]:
+    """
+    (perms, keys, lanes) for the seven symmetries other than the identity.
+    keys[color][point] packs the Zobrist keys of the images of a stone
+    of color on point into one int, 64 bits per symmetry, so that the
+    hashes of all mapped boards are updated by a single xor.
+    hash * lanes repeats a hash in every lane.
+    """
+    perms = [perm.tolist() for perm in permutations(size)[1:]]
+    keys = [[0] * len(perms[0]) for _ in range(BORDER + 1)]
+    for color in (BLACK, WHITE):
+        for point in range(len(perms[0])):
+            for t, perm in enumerate(perms):
+                keys[color][point] |= ZOBRIST[color][perm[point]] << (64 * t)
+    lanes = sum(1 << (64 * t) for t in range(len(perms)))
+    return perms, keys, lanes
 
 
 """
@@ -49,6 +102,43 @@ class GoBoard(object):
         Creates a Go board of given size
         """
         assert 2 <= size <= MAXSIZE
+        # optional SolvedDatabase, kept across boardsize and clear_board
+        self.solved_db = None
+        self.tt_entries: int = DEFAULT_TT_ENTRIES
+        # optional node and memory limits of each solve
+        self.max_nodes = None
+        self.max_memory_mb = None
+        # SearchBudget of the current or last solve
+        self.budget = None
+        # solve endgames as sums of independent regions
+        self.use_regions: bool = True
+        # stop the search where counting safe moves decides the game
+        self.use_safe_moves: bool = False
+        # search one move of each set of symmetric moves
+        self.use_symmetry: bool = True
+        # search one move of each set of equivalent eye fills
+        self.use_tempo: bool = True
+        # search with negamaxIterative instead of negamaxBoolean
+        self.iterative: bool = True
+        # order of the moves searched, one of move_order.MOVE_ORDERS
+        self.move_order: str = "array"
+        # probe the children in the transposition table before a search,
+        # and count the positions probed and the cutoffs of the last solve
+        self.use_etc: bool = False
+        self.etc_probes: int = 0
+        self.etc_cutoffs: int = 0
+        # counters of the last solve, see solve_stats.py, and whether
+        # to measure the time of is_legal and hashing
+        self.stats: SolveStats = SolveStats(size, "b")
+        self.timing: bool = False
+        # what a solve that ran out of budget learned about the root
+        # moves, see rootProgress
+        self.lost_moves: List[GO_POINT] = []
+        self.open_moves: List[Tuple[GO_POINT, float]] = []
+        # function that saves the progress of a solve, called every
+        # checkpoint_interval seconds, see checkpoint.py
+        self.checkpoint = None
+        self.checkpoint_interval: float = CHECKPOINT_INTERVAL
         self.reset(size)
 
     def reset(self, size: int) -> None:
@@ -66,8 +156,22 @@ class GoBoard(object):
         self.last_move: GO_POINT = NO_POINT
         self.last2_move: GO_POINT = NO_POINT
         self.to_win_move: GO_POINT = NO_POINT
-        self.time: int = 0
-        self.valid_points = self.validPoint()
+        # stones played with play_move or set before rehash, the
+        # stones of makeMove are counted by trail_marks
+        self.stones: int = 0
+        self.hash: int = 0
+        # the hashes of the board mapped by each symmetry, see symmetries()
+        self.sym_perms, self.sym_keys, self.sym_lanes = symmetry_keys(size)
+        self.sym_hash: int = 0
+        # pattern codes of the points, None until an order needs them,
+        # and the number of wins of each move in the current solve
+        self.pattern_cells: np.ndarray = pattern_cells(size)
+        self.patterns = None
+        self.history: np.ndarray = np.zeros((3, self.maxpoint), dtype=np.int64)
+        self.clear_illegal()
+        # session transposition table, kept between solve and genmove
+        # and across play, since NoGo positions never repeat
+        self.table = transpositiontable(self.tt_entries)
     def copy(self) -> 'GoBoard':
         b = GoBoard(self.size)
         assert b.NS == self.NS
@@ -75,8 +179,84 @@ class GoBoard(object):
         b.current_player = self.current_player
         assert b.maxpoint == self.maxpoint
         b.board = np.copy(self.board)
+        b.hash = self.hash
+        b.sym_hash = self.sym_hash
+        b.stones = self.stones
+        if self.patterns is not None:
+            b.patterns = self.patterns.copy()
+        b.illegal = [list(marks) for marks in self.illegal]
+        b.illegal_trail = list(self.illegal_trail)
+        b.trail_marks = list(self.trail_marks)
         return b
 
+    def clear_illegal(self) -> None:
+        """
+        Forget all points known to be illegal.
+        A point that is illegal for a color stays illegal for the rest of
+        the game, so is_legal marks it in illegal[color] and never tests
+        it again. Marks found during the search are kept on a trail and
+        removed by undoMove. A point illegal for both colors is dead.
+        """
+        self.illegal: List[List[bool]] = [[False] * self.maxpoint for _ in range(3)]
+        self.illegal_trail: List[Tuple[GO_POINT, GO_COLOR]] = []
+        # trail length at each makeMove
+        self.trail_marks: List[int] = []
+
+    def is_dead(self, point: GO_POINT) -> bool:
+        return self.illegal[BLACK][point] and self.illegal[WHITE][point]
+
+    def dead_points(self) -> List[GO_POINT]:
+        """
+        The empty points known to be illegal for both colors
+        """
+        return [point for point in self.get_empty_points() if self.is_dead(point)]
+
+    def tempo_class(self, point: GO_POINT, color: GO_COLOR):
+        """
+        A key shared by the moves of color that lead to equivalent
+        positions, or None if point is not such a move.
+        These moves are eyes of color, where the opponent can never play.
+        If every block next to the eye has a dead liberty, filling it
+        changes nothing but the number of moves left to color, so all
+        such eyes are one class (). Otherwise eyes next to the same
+        blocks are one class, the sorted first stones of the blocks:
+        the filled eye and the empty one only swap roles.
+        """
+        b = self.board.tolist()
+        NS = self.NS
+        stones = []
+        for nb in (point - 1, point + 1, point - NS, point + NS):
+            c = b[nb]
+            if c == color:
+                stones.append(nb)
+            elif c != BORDER:
+                return None
+        blocks = []
+        safe = True
+        marked = set()
+        for stone in stones:
+            if stone in marked:
+                continue
+            first = stone
+            dead_liberty = False
+            marked.add(stone)
+            stack = [stone]
+            while stack:
+                p = stack.pop()
+                first = min(first, p)
+                for nb in (p - 1, p + 1, p - NS, p + NS):
+                    c = b[nb]
+                    if c == color and nb not in marked:
+                        marked.add(nb)
+                        stack.append(nb)
+                    elif c == EMPTY and nb != point and not dead_liberty:
+                        dead_liberty = self.is_dead(nb)
+            blocks.append(first)
+            safe = safe and dead_liberty
+        if safe:
+            return ()
+        return tuple(sorted(blocks))
+
         
     def get_color(self, point: GO_POINT) -> GO_COLOR:
         return self.board[point]
@@ -88,16 +268,50 @@ class GoBoard(object):
         
     def is_legal(self, point: GO_POINT, color: GO_COLOR) -> bool:
         """
-        Check whether it is legal for color to play on point
-        This method tries to play the move on a temporary copy of the board.
-        This prevents the board from being modified by the move
+        Check whether it is legal for color to play on point.
+        The stone is put on the board only for the test, and the
+        blocks are searched only until their first liberty.
         """
-        board_copy: GoBoard = self.copy()
-        try:
-            can_play_move = board_copy.play_move(point, color)
-            return True
-        except ValueError:
+        board = self.board
+        if board[point] != EMPTY:
             return False
+        if self.illegal[color][point]:
+            return False
+        opp_color = opponent(color)
+        board[point] = color
+        legal = True
+        for nb in self._neighbors(point):
+            if board[nb] == opp_color and not self._block_has_liberty(nb):
+                legal = False
+                break
+        if legal:
+            legal = self._block_has_liberty(point)
+        board[point] = EMPTY
+        if not legal:
+            self.illegal[color][point] = True
+            self.illegal_trail.append((point, color))
+        return legal
+
+    def _block_has_liberty(self, stone: GO_POINT) -> bool:
+        """
+        Check whether the block of stone has a liberty,
+        stopping at the first one found
+        """
+        board = self.board
+        color = board[stone]
+        NS = self.NS
+        marked = {stone}
+        pointstack = [stone]
+        while pointstack:
+            p = pointstack.pop()
+            for nb in (p - 1, p + 1, p - NS, p + NS):
+                nb_color = board[nb]
+                if nb_color == EMPTY:
+                    return True
+                if nb_color == color and nb not in marked:
+                    marked.add(nb)
+                    pointstack.append(nb)
+        return False
 
         
            
@@ -239,6 +453,8 @@ class GoBoard(object):
             self.board[point] = EMPTY
             raise ValueError("suicide")
             
+        self._toggle_stone(point, color)
+        self.stones += 1
         self.ko_recapture = NO_POINT
         '''
         if in_enemy_eye and len(single_captures) == 1:
@@ -264,19 +480,115 @@ class GoBoard(object):
         assert winColor == opponent(self.current_player)
         return False
 
-    def validPoint(self):
-        bCoord = where1d(self.board == BLACK)
-        wCoord = where1d(self.board == WHITE)
-        eCoord = where1d(self.board == EMPTY)
-        return np.concatenate([bCoord,wCoord,eCoord])
-
     def code(self):
-        code = 0
-        for i in self.valid_points:
-            code+=  3*code + self.board[i]
-        return code
-    def storeResult(self,table,result):
-        table.store(self.code(),result)
+        """
+        Zobrist hash code of the position and the player to move
+        """
+        return self.hash ^ TOPLAY_KEY[self.current_player]
+
+    def makeMove(self,move,color):
+        """
+        Put a stone for the search, without legality checks
+        """
+        self.board[move] = color
+        self._toggle_stone(move, color)
+        self.current_player = opponent(color)
+        self.trail_marks.append(len(self.illegal_trail))
+
+    def undoMove(self,move,color):
+        """
+        Take back makeMove, and the illegal points found since
+        """
+        self.board[move] = EMPTY
+        self._toggle_stone(move, color)
+        self.current_player = color
+        mark = self.trail_marks.pop()
+        trail = self.illegal_trail
+        while len(trail) > mark:
+            point, marked_color = trail.pop()
+            self.illegal[marked_color][point] = False
+
+    def rehash(self):
+        """
+        Recompute the hash after the board array was set directly
+        """
+        self.clear_illegal()
+        self.hash = 0
+        self.sym_hash = 0
+        self.patterns = None
+        self.stones = 0
+        for point in where1d(self.board == BLACK):
+            self._toggle_stone(point, BLACK)
+            self.stones += 1
+        for point in where1d(self.board == WHITE):
+            self._toggle_stone(point, WHITE)
+            self.stones += 1
+
+    def _toggle_stone(self, point, color):
+        """
+        Add or remove a stone of color on point in the hash,
+        and its images in the hashes of the symmetric boards
+        """
+        self.hash ^= ZOBRIST[color][point]
+        self.sym_hash ^= self.sym_keys[color][point]
+        if self.patterns is not None:
+            if self.board[point] == EMPTY:
+                self.patterns[self.pattern_cells[point]] -= PATTERN_DELTA[color]
+            else:
+                self.patterns[self.pattern_cells[point]] += PATTERN_DELTA[color]
+
+    def _historyWeight(self) -> int:
+        """
+        Weight of a win in the history: the square of the number of
+        empty points of the position
+        """
+        empty = self.size * self.size - self.stones - len(self.trail_marks)
+        return empty * empty
+
+    def pattern_codes(self) -> np.ndarray:
+        """
+        The 3x3 pattern code of each point, see move_order.py
+        """
+        if self.patterns is None:
+            self.patterns = pattern_codes(self.board, self.size)
+        return self.patterns
+
+    def symmetries(self) -> List[List[GO_POINT]]:
+        """
+        The symmetries other than the identity that map the position
+        onto itself, as permutations: those whose lane of sym_hash equals
+        the hash. Like the transposition table, this trusts the 64 bit
+        Zobrist hash.
+        """
+        diff = self.sym_hash ^ self.hash * self.sym_lanes
+        found = []
+        for perm in self.sym_perms:
+            if not diff & 0xFFFFFFFFFFFFFFFF:
+                found.append(perm)
+            diff >>= 64
+        return found
+
+    def storeResult(self,table,codes,result,move=NO_POINT):
+        table.store(codes,result,move)
+        if len(self.trail_marks) <= 1 and result == (not self.trail_marks):
+            # a root move proven to win, or the root itself
+            self.stats.root_won()
+        if self.solved_db is not None and len(self.trail_marks) <= SOLVED_DB_DEPTH:
+            self.solved_db.add(self,result,move)
+        return result
+
+    def lookupSolved(self,table,codes):
+        """
+        Look up the position in the solved-position database.
+        A hit is copied into the transposition table.
+        """
+        entry = self.solved_db.lookup(self)
+        if entry is None:
+            return None
+        result, move = entry
+        if result:
+            self.to_win_move = move
+        table.store(codes,result,move)
         return result
 
     def firstSolve(self,table,point):
@@ -284,85 +596,257 @@ class GoBoard(object):
         edge = self.size +1
         mid = int((square+edge)/2)
         frstPoint = mid*2 - point[0]
-        if time.time()> self.time:
-            return False
-        timeEnded = False
+        if self.budget.tick():
+            return ABORTED
         codes = self.code()
         result = table.lookup(codes)
         if result != None:
+            if result:
+                self.to_win_move = table.winningMove(codes)
             return result
+        if self.solved_db is not None:
+            result = self.lookupSolved(table,codes)
+            if result != None:
+                return result
         color = self.current_player
         emptyCoords = self.get_empty_points()
 
         if frstPoint in emptyCoords:
-            timeEnded = False
-            self.board[frstPoint] = color
-            self.current_player = opponent(color)
-            success = not self.negamaxBoolean(table)
-            self.board[frstPoint] = EMPTY
-            self.current_player = color
-            if success:
+            self.stats.children += 1
+            self.makeMove(frstPoint,color)
+            result = self.search(table)
+            self.undoMove(frstPoint,color)
+            if result is ABORTED:
+                return ABORTED
+            if not result:
                 self.to_win_move = frstPoint
-                table.store(codes,True)
-                return True
-        for move in emptyCoords:
-            
-            if self.is_legal(move,color):
-                timeEnded = False
-                self.board[move] = color
-                self.current_player = opponent(color)
-                success = not self.negamaxBoolean(table)
-                self.board[move] = EMPTY
-                self.current_player = color
-                if success:
-                    self.to_win_move = move
-                    table.store(codes,True)
-                    return True
-        if timeEnded:
-            result = self.staticallyEvaluateForPlay()
-            table.store(codes,result)
-            return result
-        table.store(codes,False)
-        return False
+                return self.storeResult(table,codes,True,frstPoint)
+        self.stats.expanded += 1
+        for move in self._searchMoves(color):
+            self.stats.children += 1
+            self.makeMove(move,color)
+            result = self.search(table)
+            self.undoMove(move,color)
+            if result is ABORTED:
+                return ABORTED
+            if not result:
+                self.to_win_move = move
+                return self.storeResult(table,codes,True,move)
+        return self.storeResult(table,codes,False)
 
-    def negamaxBoolean(self,table):
-        
-        if time.time() > self.time:
-            return False
-        timeEnded = False
-        codes = self.code()
+    def search(self,table):
+        """
+        Returns whether the player to move wins, or ABORTED if the
+        search budget ran out, with the iterative or recursive search.
+        """
+        if self.iterative:
+            return self.negamaxIterative(table)
+        return self.negamaxBoolean(table)
+
+    def _knownResult(self,table,codes):
+        """
+        The result of the position if it is known without searching its
+        moves, None otherwise.
+        """
         result = table.lookup(codes)
         if result != None:
+            if result:
+                self.to_win_move = table.winningMove(codes)
             return result
+        if self.solved_db is not None:
+            result = self.lookupSolved(table,codes)
+            if result != None:
+                return result
+        if self.use_safe_moves:
+            answer = counting_result(self)
+            if answer is not None:
+                result, move = answer
+                if result:
+                    self.to_win_move = move
+                return self.storeResult(table,codes,result,move)
+        if self.use_etc:
+            return self._etcResult(table,codes)
+        return None
+
+    def _etcResult(self,table,codes):
+        """
+        Enhanced transposition cutoff: the position is won if the table
+        already holds a child position lost for the opponent.
+        The hash of each child is the hash of the position with one key
+        of the stone and the player to move changed.
+        """
+        self.etc_probes += 1
         color = self.current_player
-        emptyCoords = self.get_empty_points()
+        keys = ZOBRIST[color]
+        toplay = codes ^ TOPLAY_KEY[color] ^ TOPLAY_KEY[opponent(color)]
+        lookup = table.table.get
+        for move in self.get_empty_points().tolist():
+            # a child in the table is a legal position, is_legal only
+            # guards against a hash collision
+            if lookup(toplay ^ keys[move]) == False and self.is_legal(move,color):
+                self.etc_cutoffs += 1
+                self.to_win_move = move
+                return self.storeResult(table,codes,True,move)
+        return None
 
-        for move in emptyCoords:
-            
+    def _searchMoves(self,color):
+        """
+        The legal moves of color to search, in order: one of each orbit
+        under the symmetries of the board, and one of each set of
+        equivalent eye fills, in the order of move_order.
+        """
+        symmetric = self.symmetries() if self.use_symmetry else None
+        tempo = set() if self.use_tempo else None
+        points = self.get_empty_points()
+        if self.move_order != "array":
+            points = order_moves(self,color,points)
+        for move in points:
+            if symmetric and any(perm[move] < move for perm in symmetric):
+                continue
             if self.is_legal(move,color):
-                timeEnded = False
-                self.board[move] = color
-                self.current_player = opponent(color)
-                success = not self.negamaxBoolean(table)
-                self.board[move] = EMPTY
-                self.current_player = color
-                if success:
-                    self.to_win_move = move
-                    table.store(codes,True)
-                    return True
-        if timeEnded:
-            result = self.staticallyEvaluateForPlay()
-            table.store(codes,result)
+                if tempo is not None:
+                    key = self.tempo_class(move,color)
+                    if key in tempo:
+                        continue
+                    if key is not None:
+                        tempo.add(key)
+                yield move
+
+    def _regionResult(self,table,codes):
+        """
+        Solve the position as a sum of regions, see regions.py.
+        Returns the stored result, or None if it does not split or
+        the budget ran out.
+        """
+        answer = solve_by_regions(self,self.budget)
+        if answer is None:
+            return None
+        result, region_move = answer
+        if result:
+            self.to_win_move = region_move
+        return self.storeResult(table,codes,result,region_move)
+
+    def negamaxBoolean(self,table):
+        """
+        Returns whether the player to move wins, or ABORTED if the
+        search budget ran out. Aborted results are never stored.
+        """
+        if self.budget.tick():
+            return ABORTED
+        stats = self.stats
+        if len(self.trail_marks) > stats.max_depth:
+            stats.max_depth = len(self.trail_marks)
+        codes = self.code()
+        result = self._knownResult(table,codes)
+        if result is not None:
             return result
-        table.store(codes,False)
-        return False
+        stats.expanded += 1
+        color = self.current_player
+        searched = 0
+        for move in self._searchMoves(color):
+            if searched == REGION_MIN_MOVES and self.use_regions:
+                # the position is not won quickly, try to split it
+                result = self._regionResult(table,codes)
+                if result is not None:
+                    return result
+                if self.budget.expired:
+                    return ABORTED
+            searched += 1
+            stats.children += 1
+            self.makeMove(move,color)
+            result = self.negamaxBoolean(table)
+            self.undoMove(move,color)
+            if result is ABORTED:
+                return ABORTED
+            if not result:
+                self.to_win_move = move
+                if self.move_order in HISTORY_ORDERS:
+                    self.history[color][move] += self._historyWeight()
+                return self.storeResult(table,codes,True,move)
+        return self.storeResult(table,codes,False)
 
+    def negamaxIterative(self,table):
+        """
+        negamaxBoolean with an explicit stack of frames instead of
+        recursion: the same nodes in the same order, with the same
+        transposition table entries, but no Python call per ply and no
+        recursion limit.
+        A frame is (hash, player to move, iterator over the moves to
+        search, number of moves searched, move being searched); the
+        frame of the current position is kept in local variables.
+        """
+        if self.budget.tick():
+            return ABORTED
+        stats = self.stats
+        if len(self.trail_marks) > stats.max_depth:
+            stats.max_depth = len(self.trail_marks)
+        codes = self.code()
+        result = self._knownResult(table,codes)
+        if result is not None:
+            return result
+        stats.expanded += 1
+        stack = []
+        color = self.current_player
+        moves = self._searchMoves(color)
+        searched = 0
+        move = NO_POINT
+        # result is None while the current position needs its next move,
+        # else the result of the position that move leads to
+        while True:
+            if result is not None:
+                self.undoMove(move,color)
+                if not result:
+                    self.to_win_move = move
+                    if self.move_order in HISTORY_ORDERS:
+                        self.history[color][move] += self._historyWeight()
+                    result = self.storeResult(table,codes,True,move)
+                    if not stack:
+                        return result
+                    codes, color, moves, searched, move = stack.pop()
+                    continue
+                result = None
+            move = next(moves,None)
+            if move is None:
+                result = self.storeResult(table,codes,False)
+            elif searched == REGION_MIN_MOVES and self.use_regions:
+                # the position is not won quickly, try to split it
+                result = self._regionResult(table,codes)
+                if result is None and self.budget.expired:
+                    break
+            if result is not None:
+                if not stack:
+                    return result
+                codes, color, moves, searched, move = stack.pop()
+                continue
+            searched += 1
+            stats.children += 1
+            self.makeMove(move,color)
+            if self.budget.tick():
+                self.undoMove(move,color)
+                break
+            if len(self.trail_marks) > stats.max_depth:
+                stats.max_depth = len(self.trail_marks)
+            child = self.code()
+            result = self._knownResult(table,child)
+            if result is None:
+                stats.expanded += 1
+                stack.append((codes, color, moves, searched, move))
+                codes = child
+                color = self.current_player
+                moves = self._searchMoves(color)
+                searched = 0
+                move = NO_POINT
+        # the budget ran out: take back the moves of all frames
+        while stack:
+            codes, color, moves, searched, move = stack.pop()
+            self.undoMove(move,color)
+        return ABORTED
 
     def findWinner(self,point):
         
-        table = transpositiontable()
+        table = self.table
         if point == None:
-            return self.negamaxBoolean(table)
+            return self.search(table)
         else:
             return self.firstSolve(table,point)
 
@@ -376,17 +860,146 @@ class GoBoard(object):
             return point
         return
     def solve(self,color,timelimit):
-        self.time = time.time()+timelimit
+        self.budget = SearchBudget(timelimit, self.max_nodes, self.max_memory_mb,
+                                   checkpoint=self.checkpoint,
+                                   checkpoint_interval=self.checkpoint_interval)
+        self.to_win_move = NO_POINT
+        self.lost_moves = []
+        self.open_moves = []
+        self.etc_probes = 0
+        self.etc_cutoffs = 0
+        self.history[:] = 0
+        stats = SolveStats(self.size, "b" if self.current_player == BLACK else "w", self.timing)
+        self.stats = stats
+        table = self.table
+        probes, hits, stores = table.probes, table.hits, table.stores
+        if self.timing:
+            # instance attributes shadow the methods until the solve ends
+            self.is_legal = stats.timed(self.is_legal, "legal_time")
+            self.code = stats.timed(self.code, "hash_time")
+            self._toggle_stone = stats.timed(self._toggle_stone, "hash_time")
         
-        timeEnded = False
-        point = self.firstPlay()
-        checkWin = self.findWinner(point)
-        if time.time()>self.time:
-            timeEnded = True
+        if self.solved_db is not None:
+            self.solved_db.refresh()
+        try:
+            point = self.firstPlay()
+            checkWin = self.findWinner(point)
+        finally:
+            if self.timing:
+                del self.is_legal, self.code, self._toggle_stone
+        self.budget.finish()
+        if self.solved_db is not None:
+            self.solved_db.flush()
+        stats.nodes = self.budget.nodes
+        stats.time = self.budget.elapsed()
+        stats.tt_probes = table.probes - probes
+        stats.tt_hits = table.hits - hits
+        stats.tt_stores = table.stores - stores
+        stats.etc_cutoffs = self.etc_cutoffs
+        if checkWin is not ABORTED:
+            stats.result = stats.to_play if checkWin else ("w" if stats.to_play == "b" else "b")
+        if checkWin is ABORTED:
+            self.lost_moves, self.open_moves = self.rootProgress(self.current_player)
+            return False, True, self.to_win_move
         if checkWin == (color == self.current_player):
-            return True, timeEnded,self.to_win_move
+            return True, False,self.to_win_move
         else:
-            return False, timeEnded,self.to_win_move
+            return False, False,self.to_win_move
+
+    def solveAll(self,color,timelimit):
+        """
+        Classify every legal move of color as "win", "loss", or
+        "unknown" if it is not proven within timelimit seconds.
+        Returns (move, status, nodes) ordered by the nodes spent on the
+        move. One move of each set of symmetric or equivalent moves is
+        searched, in rounds that double the time per unknown move, all
+        with the shared transposition table; the others get its status.
+        """
+        table = self.table
+        total = SearchBudget(timelimit)
+        stats = SolveStats(self.size, "b" if color == BLACK else "w")
+        self.stats = stats
+        searched = list(self._searchMoves(color))
+        status = {}
+        nodes = dict.fromkeys(searched, 0)
+        limit = timelimit * SOLVE_ALL_FIRST_SHARE / max(1, len(searched))
+        unknown = searched
+        while unknown and total.remaining() > 0:
+            for move in unknown:
+                remaining = total.remaining()
+                if remaining <= 0:
+                    break
+                self.makeMove(move,color)
+                self.budget = SearchBudget(min(limit, remaining), self.max_nodes,
+                                           self.max_memory_mb)
+                result = self.search(table)
+                self.budget.finish()
+                self.undoMove(move,color)
+                nodes[move] += self.budget.nodes
+                if result is not ABORTED:
+                    status[move] = "loss" if result else "win"
+            unknown = [move for move in unknown if move not in status]
+            limit *= 2
+        total.finish()
+        stats.nodes = sum(nodes.values())
+        stats.time = total.elapsed()
+        symmetric = self.symmetries() if self.use_symmetry else []
+        tempo = {}
+        if self.use_tempo:
+            for move in searched:
+                key = self.tempo_class(move,color)
+                if key is not None:
+                    tempo.setdefault(key, move)
+        classified = []
+        for move in self.get_empty_points().tolist():
+            if not self.is_legal(move,color):
+                continue
+            # the move _searchMoves keeps of its symmetric set, then of
+            # its set of equivalent eye fills
+            searched_move = min([move] + [perm[move] for perm in symmetric])
+            if searched_move not in nodes:
+                searched_move = tempo[self.tempo_class(searched_move,color)]
+            classified.append((move, status.get(searched_move, "unknown"), nodes[searched_move]))
+        classified.sort(key=lambda entry: (entry[2], entry[0]))
+        return classified
+
+    def rootProgress(self,color):
+        """
+        What an unfinished solve proved about the moves of color, read
+        from the transposition table: (lost, open), the moves proven to
+        lose, and the unresolved moves with the fraction of the
+        opponent's replies proven to lose. Of each set of symmetric or
+        equivalent moves only the searched one is listed.
+        Open moves come best first by mobility, the legal moves of color
+        minus those of the opponent after the move, then by that fraction.
+        """
+        table = self.table
+        opp = opponent(color)
+        lost = []
+        ranked = []
+        for move in list(self._searchMoves(color)):
+            self.makeMove(move,color)
+            result = table.lookup(self.code())
+            if result is None:
+                replies = 0
+                refuted = 0
+                mobility = 0
+                for point in self.get_empty_points().tolist():
+                    if self.is_legal(point,color):
+                        mobility += 1
+                    if self.is_legal(point,opp):
+                        replies += 1
+                        self.makeMove(point,opp)
+                        if table.lookup(self.code()):
+                            refuted += 1
+                        self.undoMove(point,opp)
+                progress = refuted / replies if replies else 0.0
+                ranked.append((mobility - replies, progress, move))
+            elif result:
+                lost.append(move)
+            self.undoMove(move,color)
+        ranked.sort(key=lambda entry: entry[:2], reverse=True)
+        return lost, [(move, progress) for _, progress, move in ranked]
 
     def neighbors_of_color(self, point: GO_POINT, color: GO_COLOR) -> List:
         """ List of neighbors of point of given color """
@@ -417,16 +1030,52 @@ class GoBoard(object):
 
         
 class transpositiontable(object):
-    def __init__(self):
+    def __init__(self, maxEntries=DEFAULT_TT_ENTRIES):
             self.table = {}
+            self.moves = {}
+            self.maxEntries = maxEntries
+            # lookups, lookups that found the position, and stores
+            self.probes = 0
+            self.hits = 0
+            self.stores = 0
 
     # Used to print the whole table with print(tt)
     def __repr__(self):
         return self.table.__repr__()
+
+    def __len__(self):
+        return len(self.table)
+
+    def clear(self):
+        self.table.clear()
+        self.moves.clear()
         
-    def store(self, code, score):
+    def store(self, code, score, move=NO_POINT):
+        self.stores += 1
+        if len(self.table) >= self.maxEntries:
+            self.evict()
         self.table[code] = score
-    
+        if score:
+            self.moves[code] = move
+
     # Python dictionary returns 'None' if key not found by get()
     def lookup(self, code):
-        return self.table.get(code)
\ No newline at end of file
+        self.probes += 1
+        result = self.table.get(code)
+        if result is not None:
+            self.hits += 1
+        return result
+
+    def winningMove(self, code):
+        return self.moves.get(code, NO_POINT)
+
+    def evict(self):
+        """
+        Drop the oldest quarter of the entries.
+        Dictionaries keep insertion order, so these are the results
+        of the earliest commands of the session.
+        """
+        old = list(itertools.islice(self.table, max(1, len(self.table) // 4)))
+        for code in old:
+            del self.table[code]
+            self.moves.pop(code, None)
\ No newline at end of file
@@ -109,3 +109,43 @@ def coord_to_point(row: int, col: int, board_size: int) -> GO_POINT:
     NS = board_size + 1
     return GO_POINT(NS * row + col)
 
+"""
+GTP column letters, without i.
+"""
+COLUMNS: str = "abcdefghjklmnopqrstuvwxyz"
+
+def parse_point(text: str, size: int) -> GO_POINT:
+    """
+    Array index of a point written as in GTP, e.g. "c4"
+    """
+    return coord_to_point(int(text[1:]), COLUMNS.index(text[0].lower()) + 1, size)
+
+def format_point(point: GO_POINT, size: int) -> str:
+    """
+    A point written as in GTP, lower case, e.g. "c4"
+    """
+    row, col = divmod(point, size + 1)
+    return COLUMNS[col - 1] + str(row)
+
+"""
+Zobrist hashing.
+ZOBRIST[color][point] is a random 64 bit key for a stone of color on
+array index point, TOPLAY_KEY[color] marks the player to move, and
+SIZE_KEY[size] the board size, for keys shared by all sizes.
+GoBoard keeps the xor of the keys of all stones up to date, so
+hashing a position costs nothing per node.
+A fixed seed gives the same keys in every process.
+"""
+ZOBRIST_SEED: int = 455
+
+def _zobrist_keys(seed: int):
+    rng = random.Random(seed)
+    points = board_array_size(MAXSIZE)
+    keys = [[0] * points for _ in range(BORDER + 1)]
+    for color in (BLACK, WHITE):
+        keys[color] = [rng.getrandbits(64) for _ in range(points)]
+    toplay = [0, rng.getrandbits(64), rng.getrandbits(64)]
+    sizes = [rng.getrandbits(64) for _ in range(MAXSIZE + 1)]
+    return keys, toplay, sizes
+
+ZOBRIST, TOPLAY_KEY, SIZE_KEY = _zobrist_keys(ZOBRIST_SEED)
@@ -0,0 +1,151 @@
+"""
+budget.py
+Resource budget of one search.
+
+The solver calls SearchBudget.tick() once per node. tick() only counts
+the node and reads a flag; the clock, the node limit, the memory limit
+and the stop request of a parallel solve are checked every
+check_interval nodes. A timer thread also raises the flag at the
+deadline, so the search stops on time even if nodes are slow.
+The memory limit bounds what the process grows during the search: the
+transposition table kept between commands may already hold more.
+A long solve can also save a checkpoint from check(), in the thread of
+the search, see checkpoint.py.
+
+When the budget runs out the search returns ABORTED up to the root.
+An aborted result is not a proof and is never stored in the
+transposition table or the solved-position database.
+"""
+
+import resource
+import threading
+import time
+from typing import Callable, Optional
+
+"""
+Result of a search that ran out of budget. Distinct from True/False,
+and the same as a transposition table miss.
+"""
+ABORTED = None
+
+"""
+Number of nodes between two checks of the clock and limits.
+"""
+CHECK_INTERVAL: int = 128
+
+"""
+Seconds between two checkpoints of a solve.
+"""
+CHECKPOINT_INTERVAL: float = 300.0
+
+
+class SearchBudget(object):
+    def __init__(self, timelimit: Optional[float] = None,
+                 max_nodes: Optional[int] = None,
+                 max_memory_mb: Optional[int] = None,
+                 stop=None,
+                 check_interval: int = CHECK_INTERVAL,
+                 checkpoint: Optional[Callable[[], None]] = None,
+                 checkpoint_interval: float = CHECKPOINT_INTERVAL) -> None:
+        """
+        timelimit: seconds, or None for no time limit
+        max_nodes: maximum number of nodes, or None
+        max_memory_mb: maximum growth of the resident memory of the
+        process during the search, or None
+        stop: optional event set by another process to stop the search
+        checkpoint: optional function called every checkpoint_interval
+        seconds of the search
+        """
+        self.start: float = time.time()
+        self.deadline: Optional[float] = None
+        if timelimit is not None:
+            self.deadline = self.start + timelimit
+        self.max_nodes: Optional[int] = max_nodes
+        self.max_memory_mb: Optional[int] = max_memory_mb
+        self.start_memory_mb: float = memory_mb() if max_memory_mb is not None else 0.0
+        self.stop = stop
+        self.check_interval: int = check_interval
+        self.next_check: int = check_interval
+        self.nodes: int = 0
+        self.expired: bool = False
+        # why the budget ran out: "time", "nodes", "memory" or "stopped"
+        self.reason: Optional[str] = None
+        self.end: Optional[float] = None
+        self.checkpoint = checkpoint
+        self.checkpoint_interval: float = checkpoint_interval
+        self.next_checkpoint: float = self.start + checkpoint_interval
+        self._timer: Optional[threading.Timer] = None
+        if timelimit is not None:
+            self._timer = threading.Timer(max(0.0, timelimit), self._expire, ("time",))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _expire(self, reason: str) -> None:
+        if not self.expired:
+            self.reason = reason
+            self.expired = True
+
+    def tick(self) -> bool:
+        """
+        Count one node. Returns True if the search must stop.
+        """
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self.next_check = self.nodes + self.check_interval
+            self.check()
+        return self.expired
+
+    def check(self) -> bool:
+        if self.expired:
+            return True
+        if self.deadline is not None and time.time() > self.deadline:
+            self._expire("time")
+        elif self.max_nodes is not None and self.nodes >= self.max_nodes:
+            self._expire("nodes")
+        elif self.max_memory_mb is not None and memory_mb() - self.start_memory_mb > self.max_memory_mb:
+            self._expire("memory")
+        elif self.stop is not None and self.stop.is_set():
+            self._expire("stopped")
+        if self.checkpoint is not None and time.time() >= self.next_checkpoint:
+            self.checkpoint()
+            self.next_checkpoint = time.time() + self.checkpoint_interval
+        return self.expired
+
+    def remaining(self) -> float:
+        if self.deadline is None:
+            return float("inf")
+        return self.deadline - time.time()
+
+    def finish(self) -> None:
+        """
+        Stop the timer at the end of the search.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.end is None:
+            self.end = time.time()
+
+    def elapsed(self) -> float:
+        end = self.end if self.end is not None else time.time()
+        return end - self.start
+
+    def summary(self) -> str:
+        elapsed = self.elapsed()
+        rate = self.nodes / elapsed if elapsed > 0 else 0.0
+        text = "nodes {} time {:.2f}s ({:.0f} nodes/s)".format(self.nodes, elapsed, rate)
+        if self.expired:
+            text += " aborted: {}".format(self.reason)
+        return text
+
+
+def memory_mb() -> float:
+    """
+    Resident memory of this process in MB, read from /proc/self/statm,
+    or the peak resident memory where there is no /proc
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1024.0 * 1024.0)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
@@ -0,0 +1,205 @@
+"""
+cgt.py
+Short partizan combinatorial games in canonical form.
+
+NoGo is played under the normal play convention: the player who
+cannot move loses. A position that splits into independent regions
+is the sum of the region games, and the sum can be solved from the
+canonical forms of the regions alone.
+
+Black is Left and White is Right.
+Every Game returned by make(), add() or neg() is in canonical form and
+interned, so two games are equal exactly if they are the same object.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+
+class Game(object):
+    __slots__ = ("left", "right", "uid")
+
+    def __init__(self, left: Tuple['Game', ...], right: Tuple['Game', ...], uid: int) -> None:
+        self.left = left
+        self.right = right
+        # serial number of an interned game, -1 for a temporary one
+        self.uid = uid
+
+    def __repr__(self) -> str:
+        n = integer_value(self)
+        if n is not None:
+            return str(n)
+        if self is STAR:
+            return "*"
+        return "{{{}|{}}}".format(",".join(map(repr, self.left)),
+                                  ",".join(map(repr, self.right)))
+
+
+_interned: Dict[Tuple[Tuple[int, ...], Tuple[int, ...]], Game] = {}
+_all: List[Game] = []
+_le: Dict[Tuple[int, int], bool] = {}
+_sum: Dict[Tuple[int, int], Game] = {}
+_neg: Dict[int, Game] = {}
+
+
+def _intern(left: List[Game], right: List[Game]) -> Game:
+    left.sort(key=lambda g: g.uid)
+    right.sort(key=lambda g: g.uid)
+    key = (tuple(g.uid for g in left), tuple(g.uid for g in right))
+    game = _interned.get(key)
+    if game is None:
+        game = Game(tuple(left), tuple(right), len(_all))
+        _all.append(game)
+        _interned[key] = game
+    return game
+
+
+def le(g: Game, h: Game) -> bool:
+    """
+    g <= h, i.e. h is at least as good as g for Left:
+    no left option of g is >= h and no right option of h is <= g.
+    """
+    if g is h:
+        return True
+    memo = g.uid >= 0 and h.uid >= 0
+    if memo:
+        key = (g.uid, h.uid)
+        result = _le.get(key)
+        if result is not None:
+            return result
+    result = (not any(le(h, gl) for gl in g.left)
+              and not any(le(hr, g) for hr in h.right))
+    if memo:
+        _le[key] = result
+    return result
+
+
+def _unique(games: Iterable[Game]) -> List[Game]:
+    seen = set()
+    result = []
+    for g in games:
+        if g.uid not in seen:
+            seen.add(g.uid)
+            result.append(g)
+    return result
+
+
+def make(left: Iterable[Game], right: Iterable[Game]) -> Game:
+    """
+    Canonical form of the game {left | right}, where all options
+    are canonical: remove dominated options and bypass reversible ones
+    until neither applies.
+    """
+    left = _unique(left)
+    right = _unique(right)
+    while True:
+        left = [g for g in left if not any(g is not o and le(g, o) for o in left)]
+        right = [g for g in right if not any(g is not o and le(o, g) for o in right)]
+        game = Game(tuple(left), tuple(right), -1)
+        changed = False
+        new_left: List[Game] = []
+        for gl in left:
+            reverse = next((glr for glr in gl.right if le(glr, game)), None)
+            if reverse is None:
+                new_left.append(gl)
+            else:
+                new_left.extend(reverse.left)
+                changed = True
+        new_right: List[Game] = []
+        for gr in right:
+            reverse = next((grl for grl in gr.left if le(game, grl)), None)
+            if reverse is None:
+                new_right.append(gr)
+            else:
+                new_right.extend(reverse.right)
+                changed = True
+        if not changed:
+            return _intern(left, right)
+        left = _unique(new_left)
+        right = _unique(new_right)
+
+
+def neg(g: Game) -> Game:
+    result = _neg.get(g.uid)
+    if result is None:
+        result = make([neg(gr) for gr in g.right], [neg(gl) for gl in g.left])
+        _neg[g.uid] = result
+    return result
+
+
+def add(g: Game, h: Game) -> Game:
+    if g is ZERO:
+        return h
+    if h is ZERO:
+        return g
+    key = (g.uid, h.uid) if g.uid <= h.uid else (h.uid, g.uid)
+    result = _sum.get(key)
+    if result is None:
+        result = make([add(gl, h) for gl in g.left] + [add(g, hl) for hl in h.left],
+                      [add(gr, h) for gr in g.right] + [add(g, hr) for hr in h.right])
+        _sum[key] = result
+    return result
+
+
+def total(games: Iterable[Game]) -> Game:
+    result = ZERO
+    for g in games:
+        result = add(result, g)
+    return result
+
+
+def first_player_wins(g: Game, left_to_move: bool) -> bool:
+    """
+    Whether the player to move wins g: Left wins moving first
+    unless g <= 0, Right wins moving first unless g >= 0.
+    """
+    if left_to_move:
+        return not le(g, ZERO)
+    return not le(ZERO, g)
+
+
+def integer_value(g: Game):
+    """
+    n if g is the integer n, None otherwise
+    """
+    n = 0
+    while True:
+        if g is ZERO:
+            return n
+        if len(g.left) == 1 and not g.right and n >= 0:
+            g, n = g.left[0], n + 1
+        elif len(g.right) == 1 and not g.left and n <= 0:
+            g, n = g.right[0], n - 1
+        else:
+            return None
+
+
+def closure(games: Iterable[Game]) -> List[Game]:
+    """
+    The games and all their options, each option before the games
+    that use it.
+    """
+    seen: Dict[int, Game] = {}
+    stack = list(games)
+    while stack:
+        g = stack.pop()
+        if g.uid not in seen:
+            seen[g.uid] = g
+            stack.extend(g.left)
+            stack.extend(g.right)
+    # an interned game is created after all its options
+    return [seen[uid] for uid in sorted(seen)]
+
+
+def rebuild(options: Iterable[Tuple[List[int], List[int]]]) -> List[Game]:
+    """
+    Intern a list of games given as (left, right) lists of indices
+    of earlier games in the list, as written from closure().
+    """
+    games: List[Game] = []
+    for left, right in options:
+        games.append(_intern([games[i] for i in left], [games[i] for i in right]))
+    return games
+
+
+ZERO = _intern([], [])
+STAR = _intern([ZERO], [ZERO])
@@ -0,0 +1,202 @@
+"""
+checkpoint.py
+Checkpoints of long solves.
+
+checkpointed_solve runs GoBoard.solve and saves its progress to a file
+every checkpoint_interval seconds of the search, and for a long solve
+of the tool or of solve_resume also when it ends: the
+root position, the transposition table, the nodes and seconds spent
+over all sessions, and the result once it is proven. The table holds
+only proven results, so it is consistent at any moment of the search,
+and it is all a later session needs: resume loads the position and the
+table and solves again, and every subtree proven before is answered by
+a lookup. The root moves proven to lose and the progress on the others
+are read back from the table with GoBoard.rootProgress.
+
+The file is written next to the old one and renamed over it, so a
+machine stopped while saving leaves the previous checkpoint. It is
+    header | board array (int8) | records
+with the records of solved_db.py, keyed by GoBoard.code(). Codes are
+Zobrist hashes, only valid with the same ZOBRIST_SEED.
+
+Usage as a tool:
+    python3 checkpoint.py start --size 6 --out empty6.ckpt --timelimit 3600
+    python3 checkpoint.py start --size 7 --moves d4 c3 --out d4c3.ckpt
+    python3 checkpoint.py resume empty6.ckpt --timelimit 3600
+    python3 checkpoint.py info empty6.ckpt
+"""
+
+import argparse
+import os
+import struct
+import sys
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from board_base import BLACK, GO_POINT, NO_POINT, ZOBRIST_SEED, format_point, parse_point
+from board import GoBoard
+from budget import CHECKPOINT_INTERVAL
+from solved_db import RECORD
+
+MAGIC = b"NOGOCP01"
+# magic, size, player to move, result (-1 unknown), zobrist seed,
+# winning move, nodes, seconds, number of records
+HEADER = struct.Struct("<8sBBbxIiQdQ")
+
+
+def save_checkpoint(path: str, root: GoBoard, nodes: int, seconds: float,
+                    result: Optional[bool] = None, move: GO_POINT = NO_POINT) -> None:
+    """
+    Save the position of root and the transposition table root.table
+    """
+    table = root.table
+    records = np.zeros(len(table.table), dtype=RECORD)
+    records["key"] = np.fromiter(table.table.keys(), dtype=np.uint64, count=len(records))
+    records["result"] = np.fromiter(table.table.values(), dtype=np.int8, count=len(records))
+    records["move"] = np.fromiter((table.moves.get(code, NO_POINT) for code in table.table),
+                                  dtype=np.int32, count=len(records))
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, root.size, root.current_player,
+                            -1 if result is None else int(result), ZOBRIST_SEED,
+                            move, nodes, seconds, len(records)))
+        f.write(root.board.astype(np.int8).tobytes())
+        f.write(records.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+
+
+class Checkpoint(object):
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            data = f.read()
+        (magic, self.size, self.toplay, result, seed, move,
+         self.nodes, self.seconds, count) = HEADER.unpack(data[:HEADER.size])
+        if magic != MAGIC:
+            raise ValueError("{} is not a checkpoint".format(path))
+        if seed != ZOBRIST_SEED:
+            raise ValueError("{} was saved with Zobrist seed {}".format(path, seed))
+        self.path: str = path
+        self.result: Optional[bool] = None if result < 0 else bool(result)
+        self.move: GO_POINT = move
+        offset = HEADER.size
+        points = len(GoBoard(self.size).board)
+        self.board: np.ndarray = np.frombuffer(data, dtype=np.int8, count=points, offset=offset)
+        self.records: np.ndarray = np.frombuffer(data, dtype=RECORD, count=count,
+                                                 offset=offset + points)
+
+    def restore(self, board: GoBoard) -> None:
+        """
+        Set up the position on board, with the saved transposition table
+        """
+        board.reset(self.size)
+        board.board[:] = self.board
+        board.current_player = self.toplay
+        board.rehash()
+        board.table.table.update(zip(self.records["key"].tolist(),
+                                     self.records["result"].astype(bool).tolist()))
+        won = self.records[self.records["result"] != 0]
+        board.table.moves.update(zip(won["key"].tolist(), won["move"].tolist()))
+
+
+def checkpointed_solve(board: GoBoard, path: str, timelimit: Optional[float],
+                       interval: float = CHECKPOINT_INTERVAL,
+                       spent: Tuple[int, float] = (0, 0.0),
+                       save_at_end: bool = True) -> Tuple[bool, bool, GO_POINT]:
+    """
+    board.solve for the player to move, saving a checkpoint to path
+    every interval seconds, and at the end if save_at_end.
+    Saving writes the whole transposition table, so the GTP engine
+    only saves at the end of a solve it resumed.
+    spent: (nodes, seconds) of earlier sessions of this solve
+    """
+    root = board.copy()
+    root.table = board.table
+    nodes, seconds = spent
+
+    def save(result: Optional[bool] = None, move: GO_POINT = NO_POINT) -> None:
+        budget = board.budget
+        save_checkpoint(path, root, nodes + budget.nodes, seconds + budget.elapsed(), result, move)
+
+    board.checkpoint = save
+    board.checkpoint_interval = interval
+    try:
+        answer = board.solve(board.current_player, timelimit)
+    finally:
+        board.checkpoint = None
+    if not save_at_end:
+        return answer
+    win, time_ended, move = answer
+    if time_ended:
+        save()
+    else:
+        save(win, move if win else NO_POINT)
+    return answer
+
+
+def resume(board: GoBoard, path: str, timelimit: Optional[float],
+           interval: float = CHECKPOINT_INTERVAL) -> Tuple[bool, bool, GO_POINT]:
+    """
+    Continue the solve saved in path, on board
+    """
+    checkpoint = Checkpoint(path)
+    checkpoint.restore(board)
+    return checkpointed_solve(board, path, timelimit, interval,
+                              (checkpoint.nodes, checkpoint.seconds))
+
+
+def describe(checkpoint: Checkpoint) -> str:
+    board = GoBoard(checkpoint.size)
+    checkpoint.restore(board)
+    lines = ["{0}: {1}x{1}, {2} to play, {3} entries, {4} nodes in {5:.0f}s".format(
+        checkpoint.path, checkpoint.size, "b" if checkpoint.toplay == BLACK else "w",
+        len(checkpoint.records), checkpoint.nodes, checkpoint.seconds)]
+    if checkpoint.result is not None:
+        lines.append("result: " + ("win " + format_point(checkpoint.move, checkpoint.size)
+                                   if checkpoint.result else "loss"))
+    else:
+        lost, open_moves = board.rootProgress(board.current_player)
+        lines.append("lost: " + " ".join(format_point(move, checkpoint.size) for move in lost))
+        lines.append("open: " + " ".join("{} {:.2f}".format(format_point(move, checkpoint.size),
+                                                            progress)
+                                         for move, progress in open_moves))
+    return "\n".join(lines)
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Long NoGo solves with checkpoints",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    start = sub.add_parser("start")
+    start.add_argument("--size", type=int, default=6, help="board size")
+    start.add_argument("--moves", nargs="*", default=[],
+                       help="moves played from the empty board, Black first")
+    start.add_argument("--out", type=str, required=True, help="checkpoint file")
+    again = sub.add_parser("resume")
+    again.add_argument("file")
+    for command in (start, again):
+        command.add_argument("--timelimit", type=float, default=None,
+                             help="seconds for this session, default no limit")
+        command.add_argument("--interval", type=float, default=CHECKPOINT_INTERVAL,
+                             help="seconds between checkpoints")
+    show = sub.add_parser("info")
+    show.add_argument("file")
+    args = parser.parse_args(argv)
+    board = GoBoard(args.size if args.command == "start" else 7)
+    if args.command == "start":
+        for point in args.moves:
+            board.play_move(parse_point(point, args.size), board.current_player)
+        path = args.out
+        checkpointed_solve(board, path, args.timelimit, args.interval)
+    elif args.command == "resume":
+        path = args.file
+        resume(board, path, args.timelimit, args.interval)
+    else:
+        path = args.file
+    print(describe(Checkpoint(path)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
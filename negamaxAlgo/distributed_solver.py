@@ -0,0 +1,483 @@
+"""
+distributed_solver.py
+Solve with worker processes that connect over sockets.
+
+A DistributedSolver listens on a TCP address host:port or on a Unix
+socket unix:PATH. Workers connect to it, from this machine or others,
+with the worker command below, or are started locally by the solver.
+Messages are JSON objects, one per line.
+
+The root moves of a solve are the first tasks. An idle worker gets the
+next queued task, and when the queue is empty it steals: the
+shallowest running task that was not split yet is split into one task
+per move, and the idle worker takes the first of them while the
+worker of the split task keeps searching it. A task is proven when its
+worker proves it, or from its children as in the search: it wins if a
+child loses, and loses when every child wins. Every proven task is
+sent to all workers, which add it to their transposition tables during
+the search, so the worker of a split task picks up what the stealers
+proved.
+
+A task is cancelled as soon as its result no longer matters: when it
+or its parent is proven, and all tasks when the root is proven or the
+time is up. Workers keep one transposition table per board size for
+all the tasks and solves they run.
+
+Usage as a tool:
+    python3 distributed_solver.py worker localhost:5555
+    python3 distributed_solver.py solve --size 5 --moves c3 --address localhost:5555 --workers 2
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from board_base import GO_COLOR, GO_POINT, NO_POINT, format_point, opponent, parse_point
+from board import GoBoard, transpositiontable
+from budget import ABORTED, SearchBudget
+
+"""
+Search settings of the coordinator's board that the workers use too.
+"""
+OPTIONS = ("use_regions", "use_safe_moves", "use_symmetry", "use_tempo", "iterative", "use_etc",
+           "move_order")
+
+"""
+Seconds between two reads of the proven results by a searching worker.
+"""
+SHARE_INTERVAL: float = 0.1
+
+"""
+Seconds to wait for the workers to answer the cancels at the end of a
+solve, and for local workers to exit at close.
+"""
+STOP_GRACE: float = 2.0
+
+
+def parse_address(address: str) -> Tuple[int, Any]:
+    """
+    (socket family, address) of unix:PATH or host:port
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "localhost", int(port))
+
+
+def _send(sock: socket.socket, message: Dict[str, Any]) -> None:
+    sock.sendall((json.dumps(message) + "\n").encode())
+
+
+class _Task(object):
+    def __init__(self, ident: int, array: np.ndarray, toplay: GO_COLOR, code: int,
+                 parent: Optional['_Task'], move: GO_POINT) -> None:
+        self.ident: int = ident
+        self.array: np.ndarray = array
+        self.toplay: GO_COLOR = toplay
+        self.code: int = code
+        self.parent: Optional[_Task] = parent
+        # move of the parent that leads here
+        self.move: GO_POINT = move
+        self.depth: int = 0 if parent is None else parent.depth + 1
+        # None while unknown, else True if toplay wins
+        self.result: Optional[bool] = None
+        self.winning_move: GO_POINT = NO_POINT
+        self.children: List[_Task] = []
+        self.split: bool = False
+        # children not proven to win yet
+        self.open: int = 0
+        self.worker: 'Optional[_Worker]' = None
+
+    def live(self) -> bool:
+        """
+        Whether the result still matters: no ancestor is proven
+        """
+        task: Optional[_Task] = self
+        while task is not None:
+            if task.result is not None:
+                return False
+            task = task.parent
+        return True
+
+
+class _Worker(object):
+    def __init__(self, sock: socket.socket, name: str) -> None:
+        self.sock: socket.socket = sock
+        self.name: str = name
+        # task sent to the worker and not answered yet
+        self.task: Optional[_Task] = None
+
+    def send(self, message: Dict[str, Any]) -> None:
+        try:
+            _send(self.sock, message)
+        except OSError:
+            # the reader thread reports the worker as gone
+            pass
+
+
+class DistributedSolver(object):
+    def __init__(self, address: str, local_workers: int = 0) -> None:
+        """
+        Listen on address, and start local_workers worker processes.
+        Port 0 picks a free port, see self.address.
+        """
+        family, where = parse_address(address)
+        self.listener: socket.socket = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_UNIX:
+            if os.path.exists(where):
+                os.unlink(where)
+            self.address: str = address
+        else:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(where)
+        self.listener.listen()
+        if family == socket.AF_INET:
+            host, port = self.listener.getsockname()[:2]
+            self.address = "{}:{}".format(where[0], port)
+        self.unix_path: Optional[str] = where if family == socket.AF_UNIX else None
+        # (kind, worker, message) from the connection threads:
+        # "join", "message" or "gone"
+        self.events: queue.Queue = queue.Queue()
+        self.workers: List[_Worker] = []
+        self.tasks: Dict[int, _Task] = {}
+        self.queue: Deque[_Task] = deque()
+        self.next_ident: int = 0
+        self.board: Optional[GoBoard] = None
+        # local workers are forked before any thread is started
+        context = multiprocessing.get_context("fork")
+        self.processes = [context.Process(target=run_worker, args=(self.address,), daemon=True)
+                          for _ in range(local_workers)]
+        for process in self.processes:
+            process.start()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                sock, peer = self.listener.accept()
+            except OSError:
+                return
+            worker = _Worker(sock, str(peer) if peer else "local")
+            self.events.put(("join", worker, None))
+            threading.Thread(target=self._read, args=(worker,), daemon=True).start()
+
+    def _read(self, worker: _Worker) -> None:
+        try:
+            for line in worker.sock.makefile("r"):
+                self.events.put(("message", worker, json.loads(line)))
+        except (OSError, ValueError):
+            pass
+        self.events.put(("gone", worker, None))
+
+    def solve(self, board: GoBoard, timelimit: float) -> Tuple[bool, bool, GO_POINT]:
+        """
+        Solve board for the player to move with the connected workers.
+        Returns (win for player to move, time ended, winning move),
+        the same as GoBoard.solve. board.budget counts the nodes of
+        all workers.
+        """
+        deadline = time.time() + timelimit
+        board.budget = SearchBudget()
+        board.to_win_move = NO_POINT
+        codes = board.code()
+        known = board.table.lookup(codes)
+        if known is not None:
+            board.budget.finish()
+            return known, False, board.table.winningMove(codes)
+        self.board = board
+        self.tasks = {}
+        self.queue = deque()
+        root = self._task(board.board.copy(), board.current_player, codes, None, NO_POINT)
+        self._split(root)
+        while True:
+            self._assign(deadline)
+            remaining = deadline - time.time()
+            if root.result is not None or remaining <= 0:
+                break
+            try:
+                kind, worker, message = self.events.get(timeout=remaining)
+            except queue.Empty:
+                break
+            self._handle(kind, worker, message)
+        for task in self.tasks.values():
+            if task.worker is not None:
+                task.worker.send({"type": "cancel", "task": task.ident})
+        # collect the answers to the cancels, for their nodes
+        grace = time.time() + STOP_GRACE
+        while any(task.worker is not None for task in self.tasks.values()):
+            remaining = grace - time.time()
+            if remaining <= 0:
+                break
+            try:
+                kind, worker, message = self.events.get(timeout=remaining)
+            except queue.Empty:
+                break
+            self._handle(kind, worker, message)
+        board.budget.finish()
+        self.board = None
+        if root.result is None:
+            return False, True, NO_POINT
+        if root.result:
+            board.to_win_move = root.winning_move
+        return root.result, False, root.winning_move
+
+    def _task(self, array: np.ndarray, toplay: GO_COLOR, code: int,
+              parent: Optional[_Task], move: GO_POINT) -> _Task:
+        task = _Task(self.next_ident, array, toplay, code, parent, move)
+        self.next_ident += 1
+        self.tasks[task.ident] = task
+        return task
+
+    def _split(self, task: _Task) -> None:
+        """
+        Queue one task per move of task, or prove it from the table
+        """
+        board = GoBoard(self.board.size)
+        for name in OPTIONS:
+            setattr(board, name, getattr(self.board, name))
+        board.board[:] = task.array
+        board.current_player = task.toplay
+        board.rehash()
+        color = task.toplay
+        moves = list(board._searchMoves(color))
+        task.split = True
+        task.open = len(moves)
+        if not moves:
+            self._prove(task, False)
+            return
+        table = self.board.table
+        for move in moves:
+            board.makeMove(move, color)
+            child = self._task(board.board.copy(), opponent(color), board.code(), task, move)
+            board.undoMove(move, color)
+            task.children.append(child)
+            known = table.lookup(child.code)
+            if known is None:
+                self.queue.append(child)
+                continue
+            self._prove(child, known, table.winningMove(child.code))
+            if task.result is not None:
+                return
+
+    def _prove(self, task: _Task, result: bool, move: GO_POINT = NO_POINT) -> None:
+        if task.result is not None:
+            return
+        task.result = result
+        task.winning_move = move
+        self.board.table.store(task.code, result, move)
+        for worker in self.workers:
+            worker.send({"type": "proven", "size": self.board.size,
+                         "results": [[task.code, result, int(move)]]})
+        self._cancel(task)
+        parent = task.parent
+        if parent is None:
+            return
+        if not result:
+            self._prove(parent, True, task.move)
+        else:
+            parent.open -= 1
+            if parent.open == 0:
+                self._prove(parent, False)
+
+    def _cancel(self, task: _Task) -> None:
+        """
+        Stop the workers searching task or a task below it
+        """
+        if task.worker is not None:
+            task.worker.send({"type": "cancel", "task": task.ident})
+        for child in task.children:
+            self._cancel(child)
+
+    def _next_task(self) -> Optional[_Task]:
+        """
+        The next queued task that still matters, or one stolen from a
+        running task
+        """
+        while True:
+            while self.queue:
+                task = self.queue.popleft()
+                if task.result is None and task.worker is None and task.live():
+                    return task
+            running = [task for task in self.tasks.values()
+                       if task.worker is not None and not task.split and task.live()]
+            if not running:
+                return None
+            self._split(min(running, key=lambda task: (task.depth, task.ident)))
+
+    def _assign(self, deadline: float) -> None:
+        for worker in self.workers:
+            if worker.task is not None:
+                continue
+            task = self._next_task()
+            if task is None:
+                return
+            task.worker = worker
+            worker.task = task
+            options = {name: getattr(self.board, name) for name in OPTIONS}
+            worker.send({"type": "task", "task": task.ident, "size": self.board.size,
+                         "board": task.array.tolist(), "toplay": int(task.toplay),
+                         "timelimit": max(0.0, deadline - time.time()), "options": options})
+
+    def _handle(self, kind: str, worker: _Worker, message: Optional[Dict[str, Any]]) -> None:
+        if kind == "join":
+            self.workers.append(worker)
+            return
+        task = worker.task
+        if kind == "gone":
+            self.workers.remove(worker)
+            if task is not None and self.tasks.get(task.ident) is task:
+                task.worker = None
+                if task.result is None:
+                    self.queue.appendleft(task)
+            return
+        # a result; the task may be from an earlier solve
+        worker.task = None
+        if task is None or self.tasks.get(task.ident) is not task:
+            return
+        task.worker = None
+        self.board.budget.nodes += message["nodes"]
+        if message["result"] is not None and task.live():
+            self._prove(task, message["result"], message["move"])
+
+    def close(self) -> None:
+        """
+        Stop all workers and the server
+        """
+        for worker in self.workers:
+            worker.send({"type": "stop"})
+            worker.sock.close()
+        self.listener.close()
+        for process in self.processes:
+            process.join(STOP_GRACE)
+            if process.is_alive():
+                process.terminate()
+        if self.unix_path is not None and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+
+def run_worker(address: str) -> None:
+    """
+    Connect to a DistributedSolver at address and solve its tasks
+    until it stops or closes the connection
+    """
+    family, where = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.connect(where)
+    tasks: queue.Queue = queue.Queue()
+    proven: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    cancelled = set()
+    current = [None]
+
+    def read() -> None:
+        try:
+            for line in sock.makefile("r"):
+                message = json.loads(line)
+                kind = message["type"]
+                if kind == "task":
+                    tasks.put(message)
+                elif kind == "proven":
+                    proven.put(message)
+                elif kind == "cancel":
+                    cancelled.add(message["task"])
+                    if current[0] == message["task"]:
+                        stop.set()
+                elif kind == "stop":
+                    break
+        except (OSError, ValueError):
+            pass
+        stop.set()
+        tasks.put(None)
+
+    threading.Thread(target=read, daemon=True).start()
+    tables: Dict[int, transpositiontable] = {}
+
+    def share() -> None:
+        while not proven.empty():
+            message = proven.get()
+            table = tables.setdefault(message["size"], transpositiontable())
+            for code, result, move in message["results"]:
+                table.store(code, result, move)
+
+    while True:
+        message = tasks.get()
+        if message is None:
+            break
+        ident = message["task"]
+        stop.clear()
+        current[0] = ident
+        share()
+        result, move, nodes = ABORTED, NO_POINT, 0
+        if ident not in cancelled:
+            board = GoBoard(message["size"])
+            for name, value in message["options"].items():
+                setattr(board, name, value)
+            board.board[:] = message["board"]
+            board.current_player = message["toplay"]
+            board.rehash()
+            board.table = tables.setdefault(board.size, transpositiontable())
+            board.budget = SearchBudget(message["timelimit"], stop=stop, checkpoint=share,
+                                        checkpoint_interval=SHARE_INTERVAL)
+            result = board.search(board.table)
+            board.budget.finish()
+            nodes = board.budget.nodes
+            if result:
+                move = board.to_win_move
+        current[0] = None
+        cancelled.discard(ident)
+        try:
+            _send(sock, {"type": "result", "task": ident, "result": result,
+                         "move": int(move), "nodes": nodes})
+        except OSError:
+            break
+    sock.close()
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Distributed NoGo solver",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker")
+    worker.add_argument("address", help="host:port or unix:PATH of the solver")
+    solve = sub.add_parser("solve")
+    solve.add_argument("--size", type=int, default=5, help="board size")
+    solve.add_argument("--moves", nargs="*", default=[],
+                       help="moves played from the empty board, Black first")
+    solve.add_argument("--address", type=str, default="localhost:0",
+                       help="host:port or unix:PATH to listen on")
+    solve.add_argument("--workers", type=int, default=2, help="number of local workers")
+    solve.add_argument("--timelimit", type=float, default=60, help="seconds")
+    args = parser.parse_args(argv)
+    if args.command == "worker":
+        run_worker(args.address)
+        return
+    board = GoBoard(args.size)
+    for point in args.moves:
+        board.play_move(parse_point(point, args.size), board.current_player)
+    solver = DistributedSolver(args.address, args.workers)
+    sys.stderr.write("listening on {}\n".format(solver.address))
+    try:
+        win, time_ended, move = solver.solve(board, args.timelimit)
+    finally:
+        solver.close()
+    if time_ended:
+        answer = "unknown"
+    elif win:
+        answer = "win " + format_point(move, args.size)
+    else:
+        answer = "loss"
+    print("{} ({})".format(answer, board.budget.summary()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
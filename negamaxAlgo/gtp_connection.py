@@ -12,7 +12,7 @@ import traceback
 import numpy as np
 import re
 from sys import stdin, stdout, stderr
-from typing import Any, Callable, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import time
 
 from board_base import (
@@ -23,12 +23,24 @@ from board_base import (
     BORDER,
     GO_COLOR, GO_POINT,
     MAXSIZE,
+    NO_POINT,
     coord_to_point,
     opponent
 )
 from board import GoBoard
 from board_util import GoBoardUtil
 from engine import GoEngine
+from parallel_solver import parallel_solve
+from distributed_solver import DistributedSolver
+from hard_deadline import DeadlineSolver
+from opening_book import BOOK_DIR, load_book
+from outcome_table import TABLE_DIR, load_table
+from ponder import Ponderer
+from checkpoint import Checkpoint, checkpointed_solve
+from budget import CHECKPOINT_INTERVAL
+from proof_tree import ProofMap, extract_proof
+from heuristic_search import HEURISTIC_SHARE, best_move
+from solve_stats import SolveStats
 
 class GtpConnection:
     def __init__(self, go_engine: GoEngine, board: GoBoard, debug_mode: bool = False) -> None:
@@ -62,9 +74,41 @@ class GtpConnection:
             "gogui-rules_legal_moves": self.gogui_rules_legal_moves_cmd,
             "gogui-rules_final_result": self.gogui_rules_final_result_cmd,
             "solve": self.solve_cmd,
+            "solve_stats": self.solve_stats_cmd,
+            "solve_resume": self.solve_resume_cmd,
+            "solve_all": self.solve_all_cmd,
             "timelimit": self.timelimit_cmd
         }
         self.timelimit = 1
+        # share of the genmove time kept for a heuristic search when the
+        # solve runs out of time; with 0 the search only gets the time
+        # a solve that stopped early left
+        self.heuristic_share: float = HEURISTIC_SHARE
+        # number of solver processes, 1 solves in this process
+        self.workers = 1
+        # solver of connected worker processes, None to solve here
+        self.distributed: Optional[DistributedSolver] = None
+        # worker process killed when it overshoots the time limit,
+        # None to solve in this process
+        self.deadline_solver: Optional[DeadlineSolver] = None
+        # directory of the opening books, None to play without book
+        self.book_dir = BOOK_DIR
+        # book move of the last solved position, if it was in the book
+        self.book_move = None
+        # directory of the outcome tables of small boards, None to always search
+        self.table_dir = TABLE_DIR
+        # counters of the last solve, and a file to append them to as JSON lines
+        self.stats: Optional[SolveStats] = None
+        self.solve_log: Optional[str] = None
+        # winning moves of the last proven win, see proof_tree.py
+        self.proof: Optional[ProofMap] = None
+        # file that each solve saves its progress to, None to not save,
+        # and the checkpoint that the next solve continues
+        self.checkpoint_path: Optional[str] = None
+        self.checkpoint_interval: float = CHECKPOINT_INTERVAL
+        self.resumed: Optional[Checkpoint] = None
+        # search between commands, None to wait idle
+        self.ponderer: Optional[Ponderer] = None
 
         # argmap is used for argument checking
         # values: (required number of arguments,
@@ -76,7 +120,8 @@ class GtpConnection:
             "genmove": (1, "Usage: genmove {w,b}"),
             "play": (2, "Usage: play {b,w} MOVE"),
             "legal_moves": (1, "Usage: legal_moves {w,b}"),
-            "timelimit": (1, "Usage: timelimit INT")
+            "timelimit": (1, "Usage: timelimit INT"),
+            "solve_resume": (1, "Usage: solve_resume FILE")
         }
 
     def write(self, data: str) -> None:
@@ -114,6 +159,8 @@ class GtpConnection:
         args: List[str] = elements[1:]
         if self.has_arg_error(command_name, len(args)):
             return
+        if self.ponderer is not None and self.ponderer.stop():
+            self.debug_msg("Ponder: {}\n".format(self.ponderer.budget.summary()))
         if command_name in self.commands:
             try:
                 self.commands[command_name](args)
@@ -125,6 +172,14 @@ class GtpConnection:
             self.debug_msg("Unknown command: {}\n".format(command_name))
             self.error("Unknown command")
             stdout.flush()
+        self.ponder()
+
+    def ponder(self) -> None:
+        """
+        Solve the current position until the next command, if pondering
+        """
+        if self.ponderer is not None:
+            self.ponderer.start(self.board)
 
     def has_arg_error(self, cmd: str, argnum: int) -> bool:
         """
@@ -370,15 +425,18 @@ class GtpConnection:
         # change this method to use your solver
         board_color = args[0].lower()
         color = color_to_int(board_color)
-        winForCurrent, timeEnd, winningMove = self.board.solve(self.board.current_player,self.timelimit)
+        start = time.time()
+        winForCurrent, timeEnd, winningMove = self.solve_position(
+            self.timelimit * (1 - self.heuristic_share))
         move = winningMove
         
-        if (timeEnd == True):
-            self.respond("unknown")
-            move = self.go_engine.get_move(self.board, color)
+        if timeEnd:
+            # the share kept for the heuristic search, and whatever a
+            # solve stopped early by its node or memory limit left
+            move = self.heuristic_move(color, self.timelimit - (time.time() - start))
         elif (winForCurrent == False):
             #self.respond("resign")
-            move = self.go_engine.get_move(self.board, color)
+            move = self.fallback_move(color)
         
         if (move == None):
             self.respond("resign")
@@ -393,16 +451,146 @@ class GtpConnection:
                 self.respond("resign")
                 
             
+    def solve_position(self, timelimit: Optional[float] = None) -> Tuple[bool, bool, GO_POINT]:
+        """
+        Solve the current position within timelimit, default the time
+        limit, in parallel if more than one worker is configured.
+        Keeps the counters of the solve in self.stats.
+        """
+        if timelimit is None:
+            timelimit = self.timelimit
+        self.book_move = None
+        to_play = "b" if self.board.current_player == BLACK else "w"
+        stats = SolveStats(self.board.size, to_play)
+        answer = None
+        if self.proof is not None:
+            move = self.proof.lookup(self.board)
+            if move is not None:
+                self.debug_msg("Solver: proof\n")
+                stats.source = "proof"
+                answer = True, False, move
+        if answer is None and self.table_dir is not None:
+            table = load_table(self.table_dir, self.board.size)
+            entry = table.lookup(self.board) if table is not None else None
+            if entry is not None:
+                self.debug_msg("Solver: outcome table\n")
+                stats.source = "table"
+                answer = entry[0], False, entry[1]
+        if answer is None and self.book_dir is not None:
+            book = load_book(self.book_dir, self.board.size)
+            entry = book.lookup(self.board) if book is not None else None
+            if entry is not None:
+                result, self.book_move = entry
+                if result is not None:
+                    self.debug_msg("Solver: book\n")
+                    stats.source = "book"
+                    answer = result, False, self.book_move if result else NO_POINT
+        if answer is None and self.distributed is not None:
+            answer = self.distributed.solve(self.board, timelimit)
+            stats.source = "distributed"
+            stats.nodes = self.board.budget.nodes
+            stats.time = self.board.budget.elapsed()
+            self.debug_msg("Solver: {} with {} workers\n".format(
+                self.board.budget.summary(), len(self.distributed.workers)))
+        elif answer is None and self.deadline_solver is not None:
+            answer = self.deadline_solver.solve(self.board, timelimit)
+            stats.source = "worker"
+            stats.nodes = self.board.budget.nodes
+            stats.time = self.board.budget.elapsed()
+            self.debug_msg("Solver: {} in worker\n".format(self.board.budget.summary()))
+        elif answer is None and self.workers > 1:
+            answer = parallel_solve(self.board, timelimit, self.workers)
+            stats.source = "parallel"
+            stats.nodes = self.board.budget.nodes
+            stats.time = self.board.budget.elapsed()
+            self.debug_msg("Solver: {}\n".format(self.board.budget.summary()))
+        elif answer is None:
+            resumed, self.resumed = self.resumed, None
+            if resumed is not None:
+                answer = checkpointed_solve(self.board, resumed.path, timelimit,
+                                            self.checkpoint_interval,
+                                            (resumed.nodes, resumed.seconds))
+            elif self.checkpoint_path is not None:
+                answer = checkpointed_solve(self.board, self.checkpoint_path, timelimit,
+                                            self.checkpoint_interval, save_at_end=False)
+            else:
+                answer = self.board.solve(self.board.current_player, timelimit)
+            stats = self.board.stats
+            if self.board.use_etc:
+                self.debug_msg("Solver: etc cutoffs {} in {} positions\n".format(
+                    self.board.etc_cutoffs, self.board.etc_probes))
+            self.debug_msg("Solver: {}\n".format(self.board.budget.summary()))
+        win, time_ended, _ = answer
+        # the deadline worker keeps the proof in its own table and
+        # sends it after the answer, see hard_deadline.py
+        if win and not time_ended and stats.source in ("search", "parallel", "distributed"):
+            self.proof = extract_proof(self.board)
+            self.debug_msg("Solver: proof of {} positions\n".format(len(self.proof)))
+        if time_ended and stats.source in ("parallel", "distributed"):
+            self.board.lost_moves, self.board.open_moves = \
+                self.board.rootProgress(self.board.current_player)
+        if time_ended and self._debug_mode:
+            self.debug_msg("Solver: lost {}, open {}\n".format(
+                self.format_moves(self.board.lost_moves),
+                self.format_moves(move for move, _ in self.board.open_moves)))
+        if not time_ended:
+            stats.result = to_play if win else ("w" if to_play == "b" else "b")
+        self.stats = stats
+        if self.solve_log is not None:
+            stats.log(self.solve_log)
+        return answer
+
+    def fallback_move(self, color: GO_COLOR) -> GO_POINT:
+        """
+        Move to play when the solver found no win:
+        the book move if the position is in the book, else the engine's move
+        """
+        if self.book_move is not None and self.book_move != NO_POINT \
+                and self.board.is_legal(self.book_move, color):
+            return self.book_move
+        return self.go_engine.get_move(self.board, color)
+
+    def anytime_move(self, color: GO_COLOR) -> GO_POINT:
+        """
+        Move to play when the solve ran out of time: the book move if it
+        is unrefuted, else the first unrefuted move in the order of
+        GoBoard.rootProgress
+        """
+        open_moves = [move for move, _ in self.board.open_moves]
+        if self.book_move in open_moves:
+            return self.book_move
+        if open_moves:
+            return open_moves[0]
+        return self.fallback_move(color)
+
+    def heuristic_move(self, color: GO_COLOR, timelimit: float) -> GO_POINT:
+        """
+        Move to play when the solve ran out of time: the best unrefuted
+        move of a heuristic search in the time left, see
+        heuristic_search.py, else the anytime move
+        """
+        open_moves = [move for move, _ in self.board.open_moves]
+        if timelimit > 0 and open_moves:
+            move, value, depth = best_move(self.board, timelimit, open_moves)
+            if move != NO_POINT:
+                self.debug_msg("Heuristic: {} value {} depth {}, {}\n".format(
+                    self.format_moves([move]), value, depth, self.board.budget.summary()))
+                return move
+        return self.anytime_move(color)
+
+    def format_moves(self, moves) -> str:
+        return " ".join(format_point(point_to_coord(move, self.board.size)) for move in moves)
+
     def solve_cmd(self, args: List[str]) -> None:
         # remove this respond and implement this method
-        winForCurrent, timeEnd, winningMove = self.board.solve(self.board.current_player,self.timelimit)
+        winForCurrent, timeEnd, winningMove = self.solve_position()
         if self.board.current_player == BLACK:
             color = 'b'
         else:
             color = 'w'
         if timeEnd == True:
             self.respond('unknown')
-        if winForCurrent:
+        elif winForCurrent:
             move_coord = point_to_coord(winningMove,self.board.size)
             move_as_string = format_point(move_coord)
             self.respond(color + " " + move_as_string)
@@ -413,6 +601,42 @@ class GtpConnection:
                 color = 'b'
             self.respond(color)
 
+    def solve_resume_cmd(self, args: List[str]) -> None:
+        """
+        Set up the position and transposition table of a checkpoint,
+        and solve it, saving to the same file. See checkpoint.py.
+        """
+        try:
+            checkpoint = Checkpoint(args[0])
+        except (OSError, ValueError) as e:
+            self.error(str(e))
+            return
+        checkpoint.restore(self.board)
+        self.resumed = checkpoint
+        self.solve_cmd([])
+        self.resumed = None
+
+    def solve_all_cmd(self, args: List[str]) -> None:
+        """
+        Status of every legal move of the player to move within the time
+        limit, one "move status nodes" line per move, the cheapest proof
+        first. See GoBoard.solveAll.
+        """
+        lines = []
+        for move, status, nodes in self.board.solveAll(self.board.current_player, self.timelimit):
+            move_as_string = format_point(point_to_coord(move, self.board.size))
+            lines.append("{} {} {}".format(move_as_string, status, nodes))
+        self.respond("\n".join(lines))
+
+    def solve_stats_cmd(self, args: List[str]) -> None:
+        """
+        Counters of the last solve, one "name value" per line
+        """
+        if self.stats is None:
+            self.error("no solve yet")
+            return
+        self.respond(self.stats.summary())
+
     def timelimit_cmd(self,args):
         enterTime = int(args[0])
         self.timelimit = enterTime
@@ -0,0 +1,222 @@
+"""
+hard_deadline.py
+Solve in a worker process with a hard wall-clock and memory cap.
+
+The budget of a search is checked between nodes, so one slow node can
+overshoot the time limit, and a search that allocates too fast can run
+out of memory before the next check. A DeadlineSolver solves in a
+forked worker process instead, and waits for it at most the time limit
+plus DEADLINE_MARGIN. A worker that is late or ran out of memory is
+stopped and started again for the next solve, and the answer is that
+the time ran out, with the root moves proven lost and the progress on
+the others that the worker reported last.
+
+The worker reports these when it starts and every REPORT_INTERVAL
+seconds, from the checkpoint hook of its budget, see
+GoBoard.rootProgress. Its address space is capped at max_memory_mb MB
+more than it had when it started, so it gets a MemoryError instead of
+growing. The worker keeps one transposition table per board size for
+all its solves, like the workers of parallel_solver.py.
+
+When the worker proves a win it sends the result at once, and only
+then extracts the proof, see proof_tree.py, and sends it too. The
+solver does not wait for the proof: it picks it up before the next
+solve and stores it in the transposition table of the board. The
+worker gets the deadline of each solve rather than its time limit, so
+the time it spent on the last proof comes out of the next solve.
+"""
+
+import multiprocessing
+import resource
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from board_base import GO_POINT, NO_POINT
+from board import GoBoard, transpositiontable
+from budget import SearchBudget
+from ponder import SEARCH_OPTIONS
+from proof_tree import extract_proof
+
+"""
+Seconds the solver waits for the worker after the time limit.
+"""
+DEADLINE_MARGIN: float = 0.2
+
+"""
+Seconds between two progress reports of the worker.
+"""
+REPORT_INTERVAL: float = 0.25
+
+
+def _address_space() -> Optional[int]:
+    """
+    Size of the address space of this process in bytes, None if unknown
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _serve(conn, template: GoBoard, max_memory_mb: Optional[int]) -> None:
+    """
+    Worker loop: solve each position received on conn, until conn closes
+    """
+    space = _address_space()
+    if max_memory_mb is not None and space is not None:
+        limit = space + max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+    tables: Dict[int, transpositiontable] = {}
+    while True:
+        try:
+            size, array, toplay, deadline = conn.recv()
+        except EOFError:
+            return
+        board = GoBoard(size)
+        for name in SEARCH_OPTIONS:
+            setattr(board, name, getattr(template, name))
+        board.max_nodes = template.max_nodes
+        board.max_memory_mb = template.max_memory_mb
+        board.board[:] = array
+        board.current_player = toplay
+        board.rehash()
+        if size not in tables:
+            tables[size] = transpositiontable(template.table.maxEntries)
+        board.table = tables[size]
+        root = board.copy()
+        root.table = board.table
+
+        def report() -> None:
+            lost, open_moves = root.rootProgress(toplay)
+            conn.send(("progress", lost, open_moves, board.budget.nodes))
+
+        board.checkpoint = report
+        board.checkpoint_interval = REPORT_INTERVAL
+        board.budget = SearchBudget()
+        report()
+        try:
+            answer = board.solve(toplay, deadline - time.time())
+        except MemoryError:
+            board.table.clear()
+            conn.send(("memory", board.budget.nodes))
+            return
+        conn.send(("done", answer, board.lost_moves, board.open_moves,
+                   board.budget.nodes, board.budget.reason))
+        if answer[0] and not answer[1]:
+            try:
+                conn.send(("proof", size, extract_proof(board).moves))
+            except MemoryError:
+                board.table.clear()
+                return
+
+
+class DeadlineSolver(object):
+    def __init__(self, margin: float = DEADLINE_MARGIN) -> None:
+        self.margin: float = margin
+        self.process = None
+        self.conn = None
+
+    def _start(self, board: GoBoard) -> None:
+        context = multiprocessing.get_context("fork")
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child, board, board.max_memory_mb),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+
+    def solve(self, board: GoBoard, timelimit: float) -> Tuple[bool, bool, GO_POINT]:
+        """
+        Solve board for the player to move in the worker.
+        Returns within timelimit + margin, the same as GoBoard.solve.
+        Sets board.lost_moves, board.open_moves and board.budget.
+        """
+        start = time.time()
+        deadline = start + timelimit + self.margin
+        board.budget = SearchBudget()
+        board.lost_moves, board.open_moves = [], []
+        if self.process is not None:
+            self._collect_proof(board)
+        if self.process is None or not self.process.is_alive():
+            self._start(board)
+        color = board.current_player
+        self.conn.send((board.size, board.board.copy(), color, start + timelimit))
+        answer: Optional[Tuple[bool, bool, GO_POINT]] = None
+        reason = "deadline"
+        while answer is None:
+            remaining = deadline - time.time()
+            if remaining <= 0 or not self.conn.poll(remaining):
+                break
+            try:
+                message: Tuple[Any, ...] = self.conn.recv()
+            except EOFError:
+                reason = "worker died"
+                break
+            if message[0] == "progress":
+                _, board.lost_moves, board.open_moves, board.budget.nodes = message
+            elif message[0] == "memory":
+                board.budget.nodes = message[1]
+                reason = "memory"
+                break
+            elif message[0] == "done":
+                (_, answer, board.lost_moves, board.open_moves,
+                 board.budget.nodes, reason) = message
+                self._store(board, answer)
+            else:
+                self._store_proof(board, message)
+        if answer is None or reason == "memory":
+            # a late worker is still busy, and the heap of one out of
+            # memory stays near its address space cap
+            self.close()
+        if answer is None:
+            answer = (False, True, NO_POINT)
+        if answer[1]:
+            board.budget.expired = True
+            board.budget.reason = reason
+        board.budget.finish()
+        return answer
+
+    def _store(self, board: GoBoard, answer: Tuple[bool, bool, GO_POINT]) -> None:
+        """
+        Keep a proven result of the worker in the transposition table
+        """
+        win, time_ended, move = answer
+        if time_ended:
+            return
+        board.to_win_move = move
+        board.table.store(board.code(), win, move)
+
+    def _store_proof(self, board: GoBoard, message: Tuple[Any, ...]) -> None:
+        """
+        Keep the proof of a win of the last solve, if it is for a
+        board of the same size
+        """
+        _, size, proof = message
+        if size != board.size:
+            return
+        for code, winning in proof.items():
+            board.table.store(code, True, winning)
+
+    def _collect_proof(self, board: GoBoard) -> None:
+        """
+        Store the proof the worker sent after the last solve, if it
+        has arrived; a worker still busy with it is left to finish
+        """
+        try:
+            while self.conn.poll():
+                message = self.conn.recv()
+                if message[0] == "proof":
+                    self._store_proof(board, message)
+        except EOFError:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Stop the worker, it is started again by the next solve
+        """
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+        self.process = None
+        self.conn = None
@@ -0,0 +1,132 @@
+"""
+heuristic_search.py
+Depth-limited alpha-beta for positions the solver cannot prove.
+
+best_move searches to depth 1, 2, ... until its time runs out, and
+returns the best move of the deepest search it completed. Positions
+are scored by safe_moves.evaluate for the player to move, and those
+proven by the solver, in the transposition table of the board, by
+WIN_SCORE or -WIN_SCORE. A player without legal moves has lost.
+
+The results of the search are kept in a transpositiontable of their
+own, as (depth, value, bound) with the best move, which is searched
+first in the next iteration.
+"""
+
+from typing import List, Optional, Tuple
+
+from board_base import GO_POINT, NO_POINT
+from board import GoBoard, transpositiontable
+from budget import ABORTED, SearchBudget
+from safe_moves import evaluate
+
+"""
+Score of a proven win, larger than any evaluation.
+"""
+WIN_SCORE: int = 10000
+INFINITY: int = WIN_SCORE + 1
+
+"""
+Default share of the genmove time that the GTP engine keeps for this
+search, the solve gets the rest. 0 gives the solve all of the time,
+so no position it could prove is left to the heuristic; the search
+then gets the time left by a solve that stopped early, at its node or
+memory limit, and otherwise the anytime move is played.
+"""
+HEURISTIC_SHARE: float = 0.0
+
+# bounds of a stored value
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+def _alphabeta(board: GoBoard, table: transpositiontable, depth: int,
+               alpha: int, beta: int) -> Optional[int]:
+    """
+    Value of the position for the player to move, or ABORTED
+    """
+    if board.budget.tick():
+        return ABORTED
+    code = board.code()
+    proven = board.table.lookup(code)
+    if proven is not None:
+        return WIN_SCORE if proven else -WIN_SCORE
+    entry = table.lookup(code)
+    hint = NO_POINT
+    if entry is not None:
+        entry_depth, value, bound = entry
+        hint = table.winningMove(code)
+        if entry_depth >= depth:
+            if bound == EXACT:
+                return value
+            if bound == LOWER and value >= beta:
+                return value
+            if bound == UPPER and value <= alpha:
+                return value
+    if depth == 0:
+        return evaluate(board)
+    color = board.current_player
+    moves = list(board._searchMoves(color))
+    if not moves:
+        return -WIN_SCORE
+    if hint in moves:
+        moves.remove(hint)
+        moves.insert(0, hint)
+    original_alpha = alpha
+    best, best_move = -INFINITY, moves[0]
+    for move in moves:
+        board.makeMove(move, color)
+        value = _alphabeta(board, table, depth - 1, -beta, -alpha)
+        board.undoMove(move, color)
+        if value is ABORTED:
+            return ABORTED
+        value = -value
+        if value > best:
+            best, best_move = value, move
+            alpha = max(alpha, best)
+            if alpha >= beta:
+                break
+    if best <= original_alpha:
+        bound = UPPER
+    elif best >= beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    table.store(code, (depth, best, bound), best_move)
+    return best
+
+
+def best_move(board: GoBoard, timelimit: float,
+              moves: Optional[List[GO_POINT]] = None) -> Tuple[GO_POINT, int, int]:
+    """
+    (move, value, depth) of the deepest search of the player to move
+    completed within timelimit, among moves if given.
+    move is NO_POINT if not even depth 1 was completed.
+    """
+    color = board.current_player
+    if moves is None:
+        moves = list(board._searchMoves(color))
+    board.budget = SearchBudget(timelimit, None, board.max_memory_mb)
+    table = transpositiontable()
+    best, best_value, completed = NO_POINT, -INFINITY, 0
+    for depth in range(1, len(board.get_empty_points()) + 1):
+        ordered = list(moves)
+        if best != NO_POINT:
+            ordered.remove(best)
+            ordered.insert(0, best)
+        alpha, iteration_best = -INFINITY, NO_POINT
+        for move in ordered:
+            board.makeMove(move, color)
+            value = _alphabeta(board, table, depth - 1, -INFINITY, -alpha)
+            board.undoMove(move, color)
+            if value is ABORTED:
+                break
+            if -value > alpha:
+                alpha, iteration_best = -value, move
+        else:
+            best, best_value, completed = iteration_best, alpha, depth
+            if abs(best_value) >= WIN_SCORE:
+                break
+            continue
+        break
+    board.budget.finish()
+    return best, best_value, completed
@@ -0,0 +1,105 @@
+"""
+move_order.py
+Move ordering of the solver.
+
+GoBoard._searchMoves tries the moves of a position in the order set by
+GoBoard.move_order:
+    array     the order of the points in the board array
+    pattern   highest weight first of the 3x3 pattern around the move
+    history   the moves that won most in the solve so far first, each
+              win counted by the square of the number of empty points
+    combined  history first, the pattern weight between equal histories
+Ties keep the array order.
+
+The pattern weights are the 65536 weights trained for simulatePattern,
+in its weights.txt. The pattern code of a point is the sum of
+board[point + offset] * 4**i over the offsets i of its eight
+neighbours in pattern_offsets, the address of get_pattern_address in
+simulatePattern/NoGo.py. The weights are read for Black to play; for
+White the colors of the pattern are swapped first, as the rules of NoGo
+are the same for both colors. GoBoard computes the codes of all points
+the first time an order needs them, and from then on updates the codes
+around each stone it places or takes back. It only keeps the history
+for the orders that read it.
+"""
+
+import os
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+
+from board_base import BLACK, WHITE, board_array_size
+
+MOVE_ORDERS = ("array", "pattern", "history", "combined")
+
+# the orders that read GoBoard.history
+HISTORY_ORDERS = ("history", "combined")
+
+WEIGHTS_FILE: str = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                                 "simulatePattern", "weights.txt")
+
+"""
+Code change of the eight cells around a stone of each color,
+in the order of pattern_cells.
+"""
+PATTERN_DELTA: List[Optional[np.ndarray]] = [None] * 3
+PATTERN_DELTA[BLACK] = BLACK * 4 ** np.arange(8, dtype=np.int32)
+PATTERN_DELTA[WHITE] = WHITE * 4 ** np.arange(8, dtype=np.int32)
+
+
+def pattern_offsets(size: int) -> np.ndarray:
+    ns = size + 1
+    return np.array([ns - 1, ns, ns + 1, -1, 1, -ns - 1, -ns, -ns + 1])
+
+
+@lru_cache(maxsize=None)
+def pattern_cells(size: int) -> np.ndarray:
+    """
+    cells[point, i] is the point whose code has the stone on point
+    as neighbour i. Points on the border get clipped, unused, rows.
+    """
+    points = np.arange(board_array_size(size))
+    cells = points[:, None] - pattern_offsets(size)[None, :]
+    return np.clip(cells, 0, len(points) - 1)
+
+
+def pattern_codes(board: np.ndarray, size: int) -> np.ndarray:
+    """
+    The pattern code of every point of the board array, 0 on the border
+    """
+    codes = np.zeros(len(board), dtype=np.int32)
+    ns = size + 1
+    inner = np.arange(ns + 1, len(board) - ns - 1)
+    for i, offset in enumerate(pattern_offsets(size)):
+        codes[inner] += board[inner + offset].astype(np.int32) * 4 ** i
+    return codes
+
+
+@lru_cache(maxsize=None)
+def pattern_weights(color: int, path: str = WEIGHTS_FILE) -> np.ndarray:
+    """
+    Weight of each pattern code for a move of color, read from a file
+    of "code weight" lines
+    """
+    weights = np.zeros(4 ** 8)
+    data = np.loadtxt(path)
+    weights[data[:, 0].astype(np.int64)] = data[:, 1]
+    if color == WHITE:
+        digits = (np.arange(4 ** 8)[:, None] // 4 ** np.arange(8)) % 4
+        swapped = np.where(digits == BLACK, WHITE, np.where(digits == WHITE, BLACK, digits))
+        weights = weights[(swapped * 4 ** np.arange(8)).sum(axis=1)]
+    return weights
+
+
+def order_moves(board, color: int, points: np.ndarray) -> np.ndarray:
+    """
+    points sorted best first by board.move_order for color to play
+    """
+    order = board.move_order
+    if order == "history":
+        return points[np.argsort(-board.history[color][points], kind="stable")]
+    weights = pattern_weights(color)[board.pattern_codes()[points]]
+    if order == "pattern":
+        return points[np.argsort(-weights, kind="stable")]
+    return points[np.lexsort((-weights, -board.history[color][points]))]
@@ -0,0 +1,249 @@
+"""
+opening_book.py
+Opening book for small boards, built offline by the solver.
+
+A book holds every position reachable from the empty board in at most
+depth moves, one entry per symmetry class. Each entry stores the result
+for the player to move (win, loss or unknown) and the move to play:
+the winning move, or the best-known move if the position is lost or
+could not be solved.
+
+The file is a header followed by records sorted by key
+    key (uint64) | move (int16) | result (int8) | padding
+where key is the smallest array_key of the position over the eight
+symmetries and move is given in that same orientation.
+
+Usage as a tool:
+    python3 opening_book.py build --size 5 --depth 2 --timelimit 600
+    python3 opening_book.py build --size 7 --depth 1 --serve localhost:5555 --workers 4
+    python3 opening_book.py info books/book5.bin
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from board_base import GO_POINT, NO_POINT, opponent
+from board import GoBoard, transpositiontable
+from board_util import GoBoardUtil
+from distributed_solver import DistributedSolver
+from solved_db import array_key
+from symmetry import inverse_permutations, permutations, transformed_boards
+
+MAGIC = b"NOGOBK01"
+HEADER = struct.Struct("<8sBBxxI")
+RECORD = np.dtype({"names": ["key", "move", "result"],
+                   "formats": ["<u8", "<i2", "i1"],
+                   "offsets": [0, 8, 10],
+                   "itemsize": 12})
+
+"""
+Values of the result field.
+"""
+LOSS: int = 0
+WIN: int = 1
+UNKNOWN: int = -1
+
+"""
+Default directory of the book files book<size>.bin.
+"""
+BOOK_DIR: str = os.path.join(os.path.dirname(os.path.realpath(__file__)), "books")
+
+
+def book_path(directory: str, size: int) -> str:
+    return os.path.join(directory, "book{}.bin".format(size))
+
+
+def canonical_key(board: GoBoard) -> Tuple[int, int]:
+    """
+    Returns (key, t): the smallest key of the position over all
+    symmetries, and the symmetry t that gives it.
+    """
+    best = None
+    for t, array in enumerate(transformed_boards(board.board, board.size)):
+        key = array_key(board.size, board.current_player, array)
+        if best is None or key < best[0]:
+            best = (key, t)
+    return best
+
+
+class OpeningBook(object):
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, self.size, self.depth, count = HEADER.unpack(data[:HEADER.size])
+        if magic != MAGIC:
+            raise ValueError("{} is not an opening book".format(path))
+        self.records: np.ndarray = np.frombuffer(data, dtype=RECORD,
+                                                 count=count, offset=HEADER.size)
+        self.keys: np.ndarray = self.records["key"]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def lookup(self, board: GoBoard) -> Optional[Tuple[Optional[bool], GO_POINT]]:
+        """
+        Returns (result, move) for the position of board, or None if
+        the position is not in the book. result is True if the player
+        to move wins, False if it loses and None if unknown.
+        The move is given in the orientation of board.
+        """
+        if board.size != self.size:
+            return None
+        key, t = canonical_key(board)
+        i = int(np.searchsorted(self.keys, np.uint64(key)))
+        if i >= len(self.keys) or int(self.keys[i]) != key:
+            return None
+        record = self.records[i]
+        move = GO_POINT(record["move"])
+        if move != NO_POINT:
+            move = inverse_permutations(board.size)[t][move]
+        result = None if record["result"] == UNKNOWN else bool(record["result"])
+        return result, move
+
+
+_books: Dict[Tuple[str, int], Optional[OpeningBook]] = {}
+
+
+def load_book(directory: str, size: int) -> Optional[OpeningBook]:
+    """
+    The book for size in directory, or None if there is none.
+    Each file is read the first time it is needed.
+    """
+    if (directory, size) not in _books:
+        path = book_path(directory, size)
+        _books[(directory, size)] = OpeningBook(path) if os.path.isfile(path) else None
+    return _books[(directory, size)]
+
+
+def mobility_move(board: GoBoard) -> GO_POINT:
+    """
+    Best-known move for a position the solver could not win:
+    the move that leaves the player to move the most legal moves
+    compared to the opponent.
+    """
+    color = board.current_player
+    best, best_score = NO_POINT, None
+    for move in GoBoardUtil.generate_legal_moves(board, color):
+        board.makeMove(move, color)
+        score = (len(GoBoardUtil.generate_legal_moves(board, color))
+                 - len(GoBoardUtil.generate_legal_moves(board, opponent(color))))
+        board.undoMove(move, color)
+        if best_score is None or score > best_score:
+            best, best_score = move, score
+    return best
+
+
+def book_positions(size: int, depth: int) -> List[List[GoBoard]]:
+    """
+    One representative of each symmetry class of the positions
+    reachable from the empty board, by number of moves played.
+    """
+    seen = set()
+    levels = []
+    frontier = [GoBoard(size)]
+    for _ in range(depth + 1):
+        level = []
+        for board in frontier:
+            key, _ = canonical_key(board)
+            if key not in seen:
+                seen.add(key)
+                level.append(board)
+        levels.append(level)
+        frontier = []
+        for board in level:
+            color = board.current_player
+            for move in GoBoardUtil.generate_legal_moves(board, color):
+                child = board.copy()
+                child.play_move(move, color)
+                frontier.append(child)
+    return levels
+
+
+def build_book(size: int, depth: int, timelimit: float, path: str,
+               verbose: bool = True, solver: Optional[DistributedSolver] = None) -> int:
+    """
+    Solve all book positions and write the book to path, with solver
+    if given, else in this process.
+    The deepest positions are solved first, so that one shared
+    transposition table helps with the shallower ones.
+    Returns the number of positions.
+    """
+    table = transpositiontable()
+    entries = []
+    for level in reversed(book_positions(size, depth)):
+        for board in level:
+            start = time.time()
+            board.table = table
+            if solver is not None:
+                win, time_ended, move = solver.solve(board, timelimit)
+            else:
+                win, time_ended, move = board.solve(board.current_player, timelimit)
+            if time_ended:
+                result, move = UNKNOWN, mobility_move(board)
+            elif win:
+                result = WIN
+            else:
+                result, move = LOSS, mobility_move(board)
+            key, t = canonical_key(board)
+            if move != NO_POINT:
+                move = permutations(size)[t][move]
+            entries.append((key, move, result))
+            if verbose:
+                sys.stderr.write("{} stones: {} in {:.1f}s\n".format(
+                    size * size - len(board.get_empty_points()),
+                    {WIN: "win", LOSS: "loss", UNKNOWN: "unknown"}[result],
+                    time.time() - start))
+    records = np.zeros(len(entries), dtype=RECORD)
+    for i, entry in enumerate(sorted(entries)):
+        records[i] = entry
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, size, depth, len(records)))
+        f.write(records.tobytes())
+    return len(records)
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Build or inspect a NoGo opening book",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--size", type=int, default=7, help="board size")
+    build.add_argument("--depth", type=int, default=2, help="number of moves from the empty board")
+    build.add_argument("--timelimit", type=float, default=600, help="seconds per position")
+    build.add_argument("--out", type=str, default=None, help="book file, default books/book<size>.bin")
+    build.add_argument("--serve", type=str, default=None,
+                       help="solve with workers connecting to host:port or unix:PATH")
+    build.add_argument("--workers", type=int, default=0,
+                       help="number of local workers with --serve")
+    show = sub.add_parser("info")
+    show.add_argument("file")
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        path = args.out if args.out else book_path(BOOK_DIR, args.size)
+        solver = DistributedSolver(args.serve, args.workers) if args.serve else None
+        try:
+            count = build_book(args.size, args.depth, args.timelimit, path, solver=solver)
+        finally:
+            if solver is not None:
+                solver.close()
+        print("{}: {} positions".format(path, count))
+    else:
+        book = OpeningBook(args.file)
+        results = book.records["result"]
+        print("{}: size {} depth {}, {} positions, {} wins, {} losses, {} unknown".format(
+            args.file, book.size, book.depth, len(book),
+            np.count_nonzero(results == WIN), np.count_nonzero(results == LOSS),
+            np.count_nonzero(results == UNKNOWN)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,265 @@
+"""
+outcome_table.py
+Exhaustive outcome tables for the smallest boards.
+
+The builder visits every position reachable from the empty board, one
+per symmetry class, and solves all of them with a memoized sweep. The
+table then answers solve and genmove for that board size by lookup,
+and serves as an oracle for the search solver (see check_table).
+
+A position is coded exactly: the colors of the points in row-major
+order as a base-3 number, taken in the orientation that gives the
+smallest code. The player to move follows from the stone counts, since
+Black starts and NoGo has no passes or captures.
+
+The file is a header followed by records sorted by code
+    code (uint64) | move (int8) | result (int8)
+where move is the row-major index of a winning move in the orientation
+of the code, or -1 for a lost position.
+
+Sizes up to MAX_TABLE_SIZE can be built: 4x4 has 728998 classes and
+takes about a minute, 5x5 has far too many positions to enumerate.
+
+Usage as a tool:
+    python3 outcome_table.py build --size 4
+    python3 outcome_table.py info tables/outcomes4.bin
+    python3 outcome_table.py check tables/outcomes4.bin --positions 200
+"""
+
+import argparse
+import os
+import random
+import struct
+import sys
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from board_base import BLACK, WHITE, GO_POINT, NO_POINT, coord_to_point
+from board import GoBoard
+from board_util import GoBoardUtil
+from symmetry import inverse_permutations, permutations
+
+MAGIC = b"NOGOOT01"
+HEADER = struct.Struct("<8sBxxxI")
+RECORD = np.dtype({"names": ["code", "move", "result"],
+                   "formats": ["<u8", "i1", "i1"],
+                   "offsets": [0, 8, 9],
+                   "itemsize": 10})
+
+"""
+Largest board size with an exhaustive table.
+"""
+MAX_TABLE_SIZE: int = 4
+
+"""
+Default directory of the table files outcomes<size>.bin.
+"""
+TABLE_DIR: str = os.path.join(os.path.dirname(os.path.realpath(__file__)), "tables")
+
+
+def table_path(directory: str, size: int) -> str:
+    return os.path.join(directory, "outcomes{}.bin".format(size))
+
+
+@lru_cache(maxsize=None)
+def _coding(size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (points, index, powers): the on-board points in row-major order,
+    index[t][i] the point that symmetry t moves onto points[i], and the
+    powers of 3 of the code digits.
+    """
+    points = np.array([coord_to_point(row, col, size)
+                       for row in range(1, size + 1) for col in range(1, size + 1)])
+    index = np.stack([inverse[points] for inverse in inverse_permutations(size)])
+    powers = 3 ** np.arange(size * size, dtype=np.int64)
+    return points, index, powers
+
+
+def canonical_code(board: GoBoard) -> Tuple[int, int]:
+    """
+    Returns (code, t): the smallest code of the position over all
+    symmetries, and the symmetry t that gives it.
+    """
+    _, index, powers = _coding(board.size)
+    codes = board.board[index].astype(np.int64) @ powers
+    t = int(np.argmin(codes))
+    return int(codes[t]), t
+
+
+def _move_index(board: GoBoard, t: int, move: GO_POINT) -> int:
+    points, _, _ = _coding(board.size)
+    image = permutations(board.size)[t][move]
+    return int(np.searchsorted(points, image))
+
+
+def _move_point(board: GoBoard, t: int, i: int) -> GO_POINT:
+    points, _, _ = _coding(board.size)
+    return GO_POINT(inverse_permutations(board.size)[t][points[i]])
+
+
+def _to_play(board: GoBoard) -> int:
+    black = np.count_nonzero(board.board == BLACK)
+    white = np.count_nonzero(board.board == WHITE)
+    return BLACK if black == white else WHITE
+
+
+class OutcomeTable(object):
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, self.size, count = HEADER.unpack(data[:HEADER.size])
+        if magic != MAGIC:
+            raise ValueError("{} is not an outcome table".format(path))
+        self.records: np.ndarray = np.frombuffer(data, dtype=RECORD,
+                                                 count=count, offset=HEADER.size)
+        self.codes: np.ndarray = self.records["code"]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def lookup(self, board: GoBoard) -> Optional[Tuple[bool, GO_POINT]]:
+        """
+        Returns (win for the player to move, winning move or NO_POINT),
+        or None if the position cannot be reached in a game.
+        The move is given in the orientation of board.
+        """
+        if board.size != self.size or board.current_player != _to_play(board):
+            return None
+        code, t = canonical_code(board)
+        i = int(np.searchsorted(self.codes, np.uint64(code)))
+        if i >= len(self.codes) or int(self.codes[i]) != code:
+            return None
+        record = self.records[i]
+        if not record["result"]:
+            return False, NO_POINT
+        return True, _move_point(board, t, int(record["move"]))
+
+
+_tables: Dict[Tuple[str, int], Optional[OutcomeTable]] = {}
+
+
+def load_table(directory: str, size: int) -> Optional[OutcomeTable]:
+    """
+    The table for size in directory, or None if there is none.
+    Each file is read the first time it is needed.
+    """
+    if (directory, size) not in _tables:
+        path = table_path(directory, size)
+        _tables[(directory, size)] = OutcomeTable(path) if os.path.isfile(path) else None
+    return _tables[(directory, size)]
+
+
+def solve_all(size: int) -> Dict[int, Tuple[bool, int]]:
+    """
+    Result and winning move index of every symmetry class of positions
+    reachable from the empty board, keyed by canonical code.
+    Every move of every position is searched, without cutoffs, so that
+    all reachable positions are visited.
+    """
+    board = GoBoard(size)
+    outcomes: Dict[int, Tuple[bool, int]] = {}
+
+    def visit() -> bool:
+        code, t = canonical_code(board)
+        known = outcomes.get(code)
+        if known is not None:
+            return known[0]
+        color = board.current_player
+        win, move = False, -1
+        for point in board.get_empty_points():
+            if board.is_legal(point, color):
+                board.makeMove(point, color)
+                if not visit() and not win:
+                    win, move = True, _move_index(board, t, point)
+                board.undoMove(point, color)
+        outcomes[code] = (win, move)
+        return win
+
+    visit()
+    return outcomes
+
+
+def build_table(size: int, path: str) -> int:
+    """
+    Solve every position of size and write the table to path.
+    Returns the number of positions.
+    """
+    if size > MAX_TABLE_SIZE:
+        raise ValueError("{0}x{0} has too many positions for an outcome table".format(size))
+    outcomes = solve_all(size)
+    records = np.zeros(len(outcomes), dtype=RECORD)
+    for i, code in enumerate(sorted(outcomes)):
+        win, move = outcomes[code]
+        records[i] = (code, move, win)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, size, len(records)))
+        f.write(records.tobytes())
+    return len(records)
+
+
+def check_table(table: OutcomeTable, positions: int, timelimit: float,
+                seed: int = 0) -> int:
+    """
+    Compare the table with the search solver on random positions from
+    random games. Returns the number of disagreements.
+    """
+    rng = random.Random(seed)
+    errors = 0
+    for _ in range(positions):
+        board = GoBoard(table.size)
+        for _ in range(rng.randrange(table.size * table.size)):
+            moves = GoBoardUtil.generate_legal_moves(board, board.current_player)
+            if not moves:
+                break
+            board.play_move(rng.choice(moves), board.current_player)
+        result, move = table.lookup(board)
+        win, time_ended, _ = board.copy().solve(board.current_player, timelimit)
+        if time_ended:
+            continue
+        if win != result:
+            errors += 1
+        elif result:
+            board.play_move(move, board.current_player)
+            win, time_ended, _ = board.solve(board.current_player, timelimit)
+            if win and not time_ended:
+                errors += 1
+    return errors
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Build or check a NoGo outcome table",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--size", type=int, default=4, help="board size")
+    build.add_argument("--out", type=str, default=None,
+                       help="table file, default tables/outcomes<size>.bin")
+    show = sub.add_parser("info")
+    show.add_argument("file")
+    check = sub.add_parser("check")
+    check.add_argument("file")
+    check.add_argument("--positions", type=int, default=100, help="number of random positions")
+    check.add_argument("--timelimit", type=float, default=60, help="seconds per solve")
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        path = args.out if args.out else table_path(TABLE_DIR, args.size)
+        count = build_table(args.size, path)
+        print("{}: {} positions".format(path, count))
+    elif args.command == "info":
+        table = OutcomeTable(args.file)
+        wins = int(np.count_nonzero(table.records["result"]))
+        print("{}: size {}, {} positions, {} wins, {} losses".format(
+            args.file, table.size, len(table), wins, len(table) - wins))
+    else:
+        table = OutcomeTable(args.file)
+        errors = check_table(table, args.positions, args.timelimit)
+        print("{}: {} disagreements in {} positions".format(args.file, errors, args.positions))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
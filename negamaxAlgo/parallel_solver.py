@@ -0,0 +1,239 @@
+"""
+parallel_solver.py
+Root-split parallel version of GoBoard.solve.
+
+The legal moves of the root are solved in a pool of worker processes.
+If there are few root moves compared to the number of workers, each
+root move is split further into one task per opponent reply.
+As soon as one root move is proven to win, all other work is
+cancelled. Each root move also has a stop event of its own, set when
+one reply refutes it, which stops the tasks of its other replies.
+The root is only reported lost when every root move has been proven
+to lose. A task that fails in its worker, for example with a
+MemoryError, leaves its root move unknown.
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from board_base import GO_COLOR, GO_POINT, NO_POINT, opponent
+from board import GoBoard, transpositiontable
+from budget import ABORTED, SearchBudget
+from board_util import GoBoardUtil
+from solved_db import SolvedDatabase
+
+"""
+Split the second ply if there are fewer than SPLIT_FACTOR root moves
+per worker.
+"""
+SPLIT_FACTOR: int = 2
+
+"""
+Time allowed for workers to notice a stop request after the deadline.
+"""
+STOP_GRACE: float = 0.5
+
+# state of a worker process, set up by _init_worker: the stop event
+# of the solve and those of the root moves
+_stop = None
+_root_stops: List = []
+_tables: Dict[int, transpositiontable] = {}
+_db: Optional[SolvedDatabase] = None
+
+
+class _Stops(object):
+    """
+    Stop request of a task: set when any of its events is set
+    """
+    def __init__(self, *events) -> None:
+        self.events = events
+
+    def is_set(self) -> bool:
+        return any(event.is_set() for event in self.events)
+
+
+def _init_worker(stop, root_stops: List, db_path: Optional[str], db_readonly: bool) -> None:
+    global _stop, _root_stops, _db
+    _stop = stop
+    _root_stops = root_stops
+    _tables.clear()
+    if db_path is not None:
+        _db = SolvedDatabase(db_path, readonly=db_readonly)
+
+
+def _solve_task(size: int, array: np.ndarray, toplay: GO_COLOR, deadline: float,
+                max_nodes: Optional[int], max_memory_mb: Optional[int],
+                root_index: int) -> Tuple[Optional[bool], GO_POINT]:
+    """
+    Solve one position under root move root_index in a worker.
+    Returns (win for toplay, winning move), or (None, NO_POINT)
+    if the search was stopped or ran out of budget.
+    Each worker keeps one transposition table per board size
+    for all the tasks it runs.
+    """
+    board = GoBoard(size)
+    board.board[:] = array
+    board.current_player = toplay
+    board.rehash()
+    if size not in _tables:
+        _tables[size] = transpositiontable()
+    board.table = _tables[size]
+    board.solved_db = _db
+    board.budget = SearchBudget(deadline - time.time(), max_nodes, max_memory_mb,
+                                _Stops(_stop, _root_stops[root_index]))
+    if _db is not None:
+        _db.refresh()
+    result = board.search(board.table)
+    board.budget.finish()
+    if _db is not None:
+        _db.flush()
+    if result is ABORTED:
+        return None, NO_POINT
+    return result, board.to_win_move
+
+
+class _RootMove(object):
+    def __init__(self, index: int, move: GO_POINT, code: int) -> None:
+        self.index: int = index
+        self.move: GO_POINT = move
+        self.code: int = code
+        # None while unknown, else True if the move wins
+        self.result: Optional[bool] = None
+        self.open: int = 0
+
+
+def parallel_solve(board: GoBoard, timelimit: float,
+                   workers: int) -> Tuple[bool, bool, GO_POINT]:
+    """
+    Solve board for the player to move with a pool of workers.
+    Returns (win for player to move, time ended, winning move),
+    the same as GoBoard.solve.
+    """
+    deadline = time.time() + timelimit
+    board.budget = SearchBudget()
+    board.to_win_move = NO_POINT
+    table = board.table
+    color = board.current_player
+    codes = board.code()
+    known = table.lookup(codes)
+    if known is not None:
+        return known, False, table.winningMove(codes)
+
+    # positions to solve: (root move, reply or NO_POINT, position)
+    roots: List[_RootMove] = []
+    tasks: List[Tuple[_RootMove, GO_POINT, np.ndarray, GO_COLOR]] = []
+    moves = GoBoardUtil.generate_legal_moves(board, color)
+    split = len(moves) < SPLIT_FACTOR * workers
+    for move in moves:
+        board.makeMove(move, color)
+        root = _RootMove(len(roots), move, board.code())
+        roots.append(root)
+        known = table.lookup(root.code)
+        if known is not None:
+            root.result = not known
+        elif split:
+            replies = GoBoardUtil.generate_legal_moves(board, opponent(color))
+            if not replies:
+                root.result = True
+            for reply in replies:
+                board.makeMove(reply, opponent(color))
+                tasks.append((root, reply, board.board.copy(), color))
+                board.undoMove(reply, opponent(color))
+            root.open = len(replies)
+        else:
+            tasks.append((root, NO_POINT, board.board.copy(), opponent(color)))
+            root.open = 1
+        board.undoMove(move, color)
+        if root.result:
+            return _finish(board, roots)
+
+    if tasks:
+        _run_tasks(board, roots, tasks, workers, deadline)
+    return _finish(board, roots)
+
+
+def _run_tasks(board: GoBoard, roots: List[_RootMove], tasks: List,
+               workers: int, deadline: float) -> None:
+    context = multiprocessing.get_context("fork")
+    stop = context.Event()
+    root_stops = [context.Event() for _ in roots]
+    db = board.solved_db
+    initargs = (stop, root_stops, None, False) if db is None else \
+        (stop, root_stops, db.path, db.readonly)
+    if db is not None:
+        db.flush()
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                   initializer=_init_worker, initargs=initargs)
+    pending = {}
+    for root, reply, array, toplay in tasks:
+        future = executor.submit(_solve_task, board.size, array, toplay, deadline,
+                                 board.max_nodes, board.max_memory_mb, root.index)
+        pending[future] = (root, reply)
+    try:
+        while pending:
+            remaining = deadline + STOP_GRACE - time.time()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                root, reply = pending.pop(future)
+                try:
+                    result, move = future.result()
+                except BrokenProcessPool:
+                    # a worker died, the other tasks cannot finish
+                    return
+                except Exception:
+                    continue
+                if result is None or root.result is not None:
+                    continue
+                if reply == NO_POINT:
+                    # opponent to move after root.move, a win is only
+                    # stored with the winning move of the worker
+                    root.result = not result
+                    if not result or move != NO_POINT:
+                        board.table.store(root.code, result, move)
+                elif not result:
+                    # reply refutes root.move
+                    root.result = False
+                    board.table.store(root.code, True, reply)
+                else:
+                    root.open -= 1
+                    if root.open == 0:
+                        root.result = True
+                        board.table.store(root.code, False)
+                if root.result:
+                    return
+                if root.result is False:
+                    root_stops[root.index].set()
+                    for f in [f for f, (r, _) in pending.items() if r is root]:
+                        f.cancel()
+                        del pending[f]
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        if db is not None:
+            db.refresh()
+
+
+def _finish(board: GoBoard, roots: List[_RootMove]) -> Tuple[bool, bool, GO_POINT]:
+    codes = board.code()
+    answer = (False, True, NO_POINT)
+    for root in roots:
+        if root.result:
+            board.to_win_move = root.move
+            board.storeResult(board.table, codes, True, root.move)
+            answer = (True, False, root.move)
+            break
+    else:
+        if all(root.result is False for root in roots):
+            board.storeResult(board.table, codes, False)
+            answer = (False, False, NO_POINT)
+    if board.solved_db is not None:
+        board.solved_db.flush()
+    board.budget.finish()
+    return answer
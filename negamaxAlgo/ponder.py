@@ -0,0 +1,71 @@
+"""
+ponder.py
+Search while waiting for the next GTP command.
+
+A Ponderer solves a copy of the current position in a thread while the
+GTP loop waits in stdin.readline(). The copy shares the transposition
+table and solved-position database of the board, so all it proves
+stays there: after the opponent's play the positions below that move
+are already in the table, and the next solve or genmove starts warm.
+The search has no time limit. It stops when the position is proven or
+when the next command arrives, within CHECK_INTERVAL nodes.
+
+Only one thread runs the solver at a time: the GTP loop stops the
+ponder search before it runs a command, and starts it again after.
+"""
+
+import threading
+from typing import Optional
+
+from board import GoBoard
+from budget import ABORTED, SearchBudget
+
+"""
+Search settings of the board that the ponder search uses too.
+"""
+SEARCH_OPTIONS = ("use_regions", "use_safe_moves", "use_symmetry", "use_tempo",
+                  "iterative", "use_etc", "move_order", "solved_db")
+
+
+class Ponderer(object):
+    def __init__(self) -> None:
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event: threading.Event = threading.Event()
+        # budget and result of the last ponder search
+        self.budget: Optional[SearchBudget] = None
+        self.result: Optional[bool] = ABORTED
+
+    def running(self) -> bool:
+        return self.thread is not None
+
+    def start(self, board: GoBoard) -> None:
+        """
+        Start solving the position of board in the background
+        """
+        self.stop()
+        search = board.copy()
+        for name in SEARCH_OPTIONS:
+            setattr(search, name, getattr(board, name))
+        search.table = board.table
+        self.stop_event.clear()
+        self.budget = SearchBudget(None, None, board.max_memory_mb, self.stop_event)
+        self.result = ABORTED
+        search.budget = self.budget
+        self.thread = threading.Thread(target=self._search, args=(search,), daemon=True)
+        self.thread.start()
+
+    def _search(self, board: GoBoard) -> None:
+        self.result = board.search(board.table)
+        self.budget.finish()
+
+    def stop(self) -> bool:
+        """
+        Stop the ponder search and wait for it.
+        Returns False if none was started.
+        """
+        if self.thread is None:
+            return False
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        return True
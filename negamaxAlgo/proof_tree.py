@@ -0,0 +1,109 @@
+"""
+proof_tree.py
+Winning moves along a proven line.
+
+When solve proves a win, the transposition table holds a winning move
+for every position of the proof: the root, and the positions where the
+winner is to move again after each defence. extract_proof walks these
+positions from the root and keeps their winning moves in a ProofMap.
+genmove then answers by lookup, without a search, for as long as the
+game stays inside the proof, even after the table has evicted the
+entries or was cleared by a new game.
+
+The search keeps one position of each symmetric set, so the walk
+follows one defence of each symmetric set too, and a lookup also tries
+the images of the position under the symmetries of the board. Defences
+that were not searched, like eye fills equivalent to a searched one,
+are not in the proof.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from board_base import GO_POINT, NO_POINT, TOPLAY_KEY, opponent
+from board import GoBoard
+from symmetry import inverse_permutations
+
+LANE_MASK: int = (1 << 64) - 1
+
+
+def image_codes(board: GoBoard) -> List[Tuple[int, Optional[np.ndarray]]]:
+    """
+    (code, inverse) for the position and its images under the seven
+    other symmetries: inverse maps a point of the image back to board,
+    None for the position itself. See GoBoard.symmetries for sym_hash.
+    """
+    toplay = TOPLAY_KEY[board.current_player]
+    inverses = inverse_permutations(board.size)
+    codes: List[Tuple[int, Optional[np.ndarray]]] = [(board.code(), None)]
+    sym_hash = board.sym_hash
+    for inverse in inverses[1:]:
+        codes.append(((sym_hash & LANE_MASK) ^ toplay, inverse))
+        sym_hash >>= 64
+    return codes
+
+
+def find_move(board: GoBoard, moves: Dict[int, GO_POINT]) -> Optional[GO_POINT]:
+    """
+    The winning move in moves of the position or one of its images,
+    in the orientation of board, or None
+    """
+    for code, inverse in image_codes(board):
+        move = moves.get(code)
+        if move is not None and move != NO_POINT:
+            return move if inverse is None else GO_POINT(inverse[move])
+    return None
+
+
+class ProofMap(object):
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        # position code -> winning move
+        self.moves: Dict[int, GO_POINT] = {}
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def lookup(self, board: GoBoard) -> Optional[GO_POINT]:
+        """
+        The winning move of the player to move, or None if the
+        position is not in the proof
+        """
+        if board.size != self.size:
+            return None
+        return find_move(board, self.moves)
+
+
+def extract_proof(board: GoBoard) -> ProofMap:
+    """
+    The proof of a win for the player to move of board, read from its
+    transposition table after a solve
+    """
+    proof = ProofMap(board.size)
+    moves = board.table.moves
+    board = board.copy()
+    winner = board.current_player
+    loser = opponent(winner)
+
+    def visit() -> None:
+        code = board.code()
+        if code in proof.moves:
+            return
+        move = find_move(board, moves)
+        if move is None:
+            return
+        proof.moves[code] = move
+        board.makeMove(move, winner)
+        symmetric = board.symmetries()
+        for reply in board.get_empty_points().tolist():
+            if symmetric and any(perm[reply] < reply for perm in symmetric):
+                continue
+            if board.is_legal(reply, loser):
+                board.makeMove(reply, loser)
+                visit()
+                board.undoMove(reply, loser)
+        board.undoMove(move, winner)
+
+    visit()
+    return proof
@@ -0,0 +1,158 @@
+"""
+region_cache.py
+Cache of the game values of NoGo endgame regions.
+
+A region is identified by its shape key: a tuple of small integers
+describing its points and what surrounds them, built by regions.py in
+the orientation that gives the smallest key over the eight symmetries.
+The same hole along an edge therefore has one entry wherever it is on
+the board. A state of the region, the colors on its points, is coded
+in base 3.
+
+The value of a region is its canonical game value with Black as Left.
+It describes the region for both players, so the player to move is
+not part of the key.
+
+Each value is one entry in a dict keyed by a single integer
+(region id << 32 | state code). The cache can be saved to a file:
+    header | game options (int32) | region keys (int32) | values
+The games are stored as a list of option indices, see cgt.closure().
+
+Usage as a tool:
+    python3 region_cache.py info FILE
+"""
+
+import argparse
+import os
+import struct
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import cgt
+
+MAGIC = b"NOGORC01"
+HEADER = struct.Struct("<8sIII")
+VALUE = np.dtype({"names": ["region", "state", "game"],
+                  "formats": ["<u4", "<u4", "<u4"],
+                  "offsets": [0, 4, 8],
+                  "itemsize": 12})
+
+
+def state_code(state: Tuple[int, ...]) -> int:
+    code = 0
+    for color in reversed(state):
+        code = 3 * code + color
+    return code
+
+
+class RegionCache(object):
+    def __init__(self) -> None:
+        self.ids: Dict[Tuple[int, ...], int] = {}
+        self.keys: List[Tuple[int, ...]] = []
+        self.values: Dict[int, cgt.Game] = {}
+        self.hits: int = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def clear(self) -> None:
+        self.ids.clear()
+        self.keys.clear()
+        self.values.clear()
+
+    def region_id(self, key: Tuple[int, ...]) -> int:
+        """
+        The number of the region with shape key, added if it is new
+        """
+        number = self.ids.get(key)
+        if number is None:
+            number = len(self.keys)
+            self.ids[key] = number
+            self.keys.append(key)
+        return number
+
+    def get(self, region: int, state: Tuple[int, ...]) -> Optional[cgt.Game]:
+        value = self.values.get(region << 32 | state_code(state))
+        if value is not None:
+            self.hits += 1
+        return value
+
+    def put(self, region: int, state: Tuple[int, ...], value: cgt.Game) -> None:
+        self.values[region << 32 | state_code(state)] = value
+
+    def save(self, path: str) -> None:
+        """
+        Atomically write all values to path.
+        """
+        games = cgt.closure(self.values.values())
+        index = {g.uid: i for i, g in enumerate(games)}
+        options: List[int] = []
+        for g in games:
+            options.append(len(g.left))
+            options.append(len(g.right))
+            options.extend(index[o.uid] for o in g.left)
+            options.extend(index[o.uid] for o in g.right)
+        keys: List[int] = []
+        for key in self.keys:
+            keys.append(len(key))
+            keys.extend(key)
+        values = np.zeros(len(self.values), dtype=VALUE)
+        for i, (code, game) in enumerate(self.values.items()):
+            values[i] = (code >> 32, code & 0xFFFFFFFF, index[game.uid])
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(options), len(keys), len(values)))
+            f.write(np.array(options, dtype="<i4").tobytes())
+            f.write(np.array(keys, dtype="<i4").tobytes())
+            f.write(values.tobytes())
+        os.replace(tmp, path)
+
+    def load(self, path: str) -> int:
+        """
+        Add the values saved in path to the cache.
+        Returns the number of values read.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, num_options, num_keys, num_values = HEADER.unpack(data[:HEADER.size])
+        if magic != MAGIC:
+            raise ValueError("{} is not a region cache".format(path))
+        offset = HEADER.size
+        options = np.frombuffer(data, dtype="<i4", count=num_options, offset=offset).tolist()
+        offset += 4 * num_options
+        keys = np.frombuffer(data, dtype="<i4", count=num_keys, offset=offset).tolist()
+        offset += 4 * num_keys
+        values = np.frombuffer(data, dtype=VALUE, count=num_values, offset=offset)
+
+        table = []
+        i = 0
+        while i < len(options):
+            num_left, num_right = options[i], options[i + 1]
+            i += 2
+            table.append((options[i:i + num_left], options[i + num_left:i + num_left + num_right]))
+            i += num_left + num_right
+        games = cgt.rebuild(table)
+        regions = []
+        i = 0
+        while i < len(keys):
+            regions.append(self.region_id(tuple(keys[i + 1:i + 1 + keys[i]])))
+            i += 1 + keys[i]
+        for region, state, game in values.tolist():
+            self.values[regions[region] << 32 | state] = games[game]
+        return len(values)
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Inspect a NoGo region cache")
+    parser.add_argument("command", choices=["info"])
+    parser.add_argument("file")
+    args = parser.parse_args(argv)
+    cache = RegionCache()
+    count = cache.load(args.file)
+    print("{}: {} values of {} regions".format(args.file, count, len(cache.keys)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
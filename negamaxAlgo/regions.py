@@ -0,0 +1,355 @@
+"""
+regions.py
+Region decomposition of NoGo endgames.
+
+In NoGo a point that is illegal for a color stays illegal for it for the
+rest of the game: stones are never removed, so blocks only lose
+liberties. A point illegal for both colors is dead: it stays empty,
+and it is a permanent liberty of every block next to it. Such a block
+can never be captured and can never make a move next to it suicide,
+so it does not connect the points around it.
+
+The live empty points split into independent regions: two live points
+are in the same region if they are neighbors, or if they are liberties
+of the same block without a dead liberty. Whether a move in a region is
+legal only depends on that region, so the position is the sum of the
+region games. Each region is solved once as a combinatorial game, see
+cgt.py, and the sum decides the winner without searching the product
+of all regions.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from board_base import BLACK, BORDER, EMPTY, WHITE, GO_POINT, NO_POINT, opponent
+from budget import SearchBudget
+import cgt
+from region_cache import RegionCache
+from symmetry import inverse_permutations, permutations
+
+"""
+Only decompose positions with at least REGION_MIN_EMPTY and at most
+REGION_EMPTY_LIMIT empty points. Smaller positions are searched faster
+than they are decomposed.
+"""
+REGION_MIN_EMPTY: int = 10
+REGION_EMPTY_LIMIT: int = 30
+
+"""
+The search tries to decompose a position only after this many of its
+moves failed to win. Positions won by an early move are not worth it.
+"""
+REGION_MIN_MOVES: int = 2
+
+"""
+Largest region solved as a game. Positions with a larger region
+are left to the search.
+"""
+REGION_MAX_POINTS: int = 6
+
+# neighbor kinds in a region description
+_LIVE, _DEAD, _EDGE, _SAFE, _BLOCK = range(5)
+
+State = Tuple[int, ...]
+
+
+class _Aborted(Exception):
+    pass
+
+
+class RegionGame(object):
+    def __init__(self, points: List[GO_POINT], neighbors: List[Tuple]) -> None:
+        """
+        points: the live points of the region
+        neighbors: for each point, its four neighbors as tuples
+            (_LIVE, index of the point in the region)
+            (_DEAD,) a dead point
+            (_EDGE,) the border
+            (_SAFE, color) a block with a dead liberty
+            (_BLOCK, color, label) a block without a dead liberty
+        The description does not depend on where the region is,
+        and its code is the key of the region in the value cache.
+        """
+        self.points = points
+        self.neighbors = neighbors
+        self.key = tuple(_code(nb) for nbs in neighbors for nb in nbs)
+        self.region = region_values.region_id(self.key)
+        # region points next to each block
+        self.block_points: Dict[int, List[int]] = {}
+        for i, nbs in enumerate(neighbors):
+            for nb in nbs:
+                if nb[0] == _BLOCK:
+                    self.block_points.setdefault(nb[2], []).append(i)
+
+    def empty_state(self) -> State:
+        return (EMPTY,) * len(self.points)
+
+    def _has_liberty(self, state: State, start: int, color: int) -> bool:
+        """
+        Whether the group of color containing start has a liberty.
+        Nodes are region points (>= 0) and blocks (-1 - label).
+        """
+        marked = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            if node >= 0:
+                for nb in self.neighbors[node]:
+                    kind = nb[0]
+                    if kind == _LIVE:
+                        c = state[nb[1]]
+                        if c == EMPTY:
+                            return True
+                        if c == color and nb[1] not in marked:
+                            marked.add(nb[1])
+                            stack.append(nb[1])
+                    elif kind == _DEAD:
+                        return True
+                    elif kind == _SAFE:
+                        if nb[1] == color:
+                            return True
+                    elif kind == _BLOCK and nb[1] == color:
+                        block = -1 - nb[2]
+                        if block not in marked:
+                            marked.add(block)
+                            stack.append(block)
+            else:
+                for i in self.block_points[-1 - node]:
+                    c = state[i]
+                    if c == EMPTY:
+                        return True
+                    if c == color and i not in marked:
+                        marked.add(i)
+                        stack.append(i)
+        return False
+
+    def is_legal(self, state: State, i: int, color: int) -> bool:
+        if state[i] != EMPTY:
+            return False
+        after = state[:i] + (color,) + state[i + 1:]
+        opp = opponent(color)
+        for nb in self.neighbors[i]:
+            if nb[0] == _LIVE and after[nb[1]] == opp:
+                if not self._has_liberty(after, nb[1], opp):
+                    return False
+            elif nb[0] == _BLOCK and nb[1] == opp:
+                if not self._has_liberty(after, -1 - nb[2], opp):
+                    return False
+        return self._has_liberty(after, i, color)
+
+    def moves(self, state: State, color: int) -> List[int]:
+        return [i for i in range(len(state)) if self.is_legal(state, i, color)]
+
+    def value(self, state: State, budget: Optional[SearchBudget] = None,
+              cached_only: bool = False) -> cgt.Game:
+        """
+        Canonical game value of the region in state, Black is Left.
+        With cached_only, a state not in the cache is not solved: the
+        search is stopped as if the budget ran out.
+        """
+        v = region_values.get(self.region, state)
+        if v is None:
+            if cached_only or (budget is not None and budget.tick()):
+                raise _Aborted()
+            left = [self.value(state[:i] + (BLACK,) + state[i + 1:], budget)
+                    for i in self.moves(state, BLACK)]
+            right = [self.value(state[:i] + (WHITE,) + state[i + 1:], budget)
+                     for i in self.moves(state, WHITE)]
+            v = cgt.make(left, right)
+            region_values.put(self.region, state, v)
+        return v
+
+
+def _code(nb: Tuple) -> int:
+    """
+    One neighbor of a region point as a small integer
+    """
+    code = nb[0]
+    if len(nb) > 1:
+        code |= nb[1] << 3
+    if len(nb) > 2:
+        code |= nb[2] << 5
+    return code
+
+
+# values of all region states solved in this process
+region_values: RegionCache = RegionCache()
+
+
+def decompose(board) -> Optional[List[RegionGame]]:
+    """
+    Split the position into independent regions.
+    Returns None if the number of empty points is out of range, fewer than two
+    regions, or a region too large to solve as a game.
+    """
+    empty_points = board.get_empty_points()
+    if not REGION_MIN_EMPTY <= len(empty_points) <= REGION_EMPTY_LIMIT:
+        return None
+    # plain lists and ints are much faster to index than numpy arrays
+    b = board.board.tolist()
+    NS = board.NS
+    empty_points = empty_points.tolist()
+    block_of: Dict[GO_POINT, int] = {}
+    liberties: List[set] = []
+    for p, color in enumerate(b):
+        if (color == BLACK or color == WHITE) and p not in block_of:
+            liberties.append(find_block(b, NS, p, len(liberties), block_of))
+
+    # besides the points the board knows to be dead, only a point without
+    # an empty neighbor can be dead: it is illegal for a color if it
+    # captures, or if all blocks of the color next to it have no other
+    # liberty
+    dead = set()
+    for p in empty_points:
+        if board.is_dead(p):
+            dead.add(p)
+            continue
+        nbs = (p - 1, p + 1, p - NS, p + NS)
+        if any(b[nb] == EMPTY for nb in nbs):
+            continue
+        illegal = {BLACK: False, WHITE: False}
+        alone = {BLACK: True, WHITE: True}
+        for nb in nbs:
+            color = b[nb]
+            if color == BORDER:
+                continue
+            if len(liberties[block_of[nb]]) == 1:
+                illegal[opponent(color)] = True
+            else:
+                alone[color] = False
+        if (illegal[BLACK] or alone[BLACK]) and (illegal[WHITE] or alone[WHITE]):
+            dead.add(p)
+    safe = [not dead.isdisjoint(libs) for libs in liberties]
+
+    # flood fill over live points, through blocks without a dead liberty
+    region_of: Dict[GO_POINT, int] = {}
+    groups: List[List[GO_POINT]] = []
+    for start in empty_points:
+        if start in dead or start in region_of:
+            continue
+        number = len(groups)
+        points = [start]
+        region_of[start] = number
+        stack = [start]
+        while stack:
+            p = stack.pop()
+            for nb in (p - 1, p + 1, p - NS, p + NS):
+                color = b[nb]
+                if color == EMPTY:
+                    linked = () if nb in dead else (nb,)
+                elif color == BORDER or safe[block_of[nb]]:
+                    continue
+                else:
+                    linked = liberties[block_of[nb]]
+                for q in linked:
+                    if q not in region_of:
+                        region_of[q] = number
+                        points.append(q)
+                        stack.append(q)
+        if len(points) > REGION_MAX_POINTS \
+                or (not groups and len(points) + len(dead) == len(empty_points)):
+            return None
+        groups.append(points)
+    if len(groups) < 2:
+        return None
+    return [_region_game(board, points, block_of, safe) for points in groups]
+
+
+def find_block(b: List[int], NS: int, stone: GO_POINT, number: int,
+                block_of: Dict[GO_POINT, int]) -> set:
+    """
+    Label the block of stone with number, returns its liberties
+    """
+    color = b[stone]
+    block_of[stone] = number
+    stack = [stone]
+    libs = set()
+    while stack:
+        p = stack.pop()
+        for nb in (p - 1, p + 1, p - NS, p + NS):
+            c = b[nb]
+            if c == EMPTY:
+                libs.add(nb)
+            elif c == color and nb not in block_of:
+                block_of[nb] = number
+                stack.append(nb)
+    return libs
+
+
+def _region_game(board, points: List[GO_POINT], block_of: Dict[GO_POINT, int],
+                 safe: List[bool]) -> RegionGame:
+    """
+    The region game of points, described in the orientation that gives
+    the smallest key, so that all symmetric regions share their values.
+    """
+    b = board.board
+    NS = board.NS
+    best = None
+    for perm, inverse in _symmetries(board.size):
+        image = sorted(perm[p] for p in points)
+        index = {q: i for i, q in enumerate(image)}
+        labels: Dict[int, int] = {}
+        neighbors = []
+        for q in image:
+            nbs = []
+            for nq in (q - 1, q + 1, q - NS, q + NS):
+                nb = inverse[nq]
+                color = b[nb]
+                if nq in index:
+                    nbs.append((_LIVE, index[nq]))
+                elif color == EMPTY:
+                    nbs.append((_DEAD,))
+                elif color == BORDER:
+                    nbs.append((_EDGE,))
+                elif safe[block_of[nb]]:
+                    nbs.append((_SAFE, int(color)))
+                else:
+                    label = labels.setdefault(block_of[nb], len(labels))
+                    nbs.append((_BLOCK, int(color), label))
+            neighbors.append(tuple(nbs))
+        if best is None or neighbors < best[1]:
+            best = ([inverse[q] for q in image], neighbors)
+    return RegionGame(*best)
+
+
+@lru_cache(maxsize=None)
+def _symmetries(size: int) -> List[Tuple[List[GO_POINT], List[GO_POINT]]]:
+    """
+    The symmetry permutations of the board and their inverses as lists
+    """
+    return [(perm.tolist(), inverse.tolist())
+            for perm, inverse in zip(permutations(size), inverse_permutations(size))]
+
+
+def solve_by_regions(board, budget: Optional[SearchBudget] = None,
+                     cached_only: bool = False) -> Optional[Tuple[bool, GO_POINT]]:
+    """
+    Solve the position as a sum of independent regions.
+    Returns (win for the player to move, winning move), or None if the
+    position does not decompose or the budget ran out.
+    With cached_only, only the values already in region_values are
+    used, and None is returned if one of the regions is missing.
+    The values of a region are cached after those of all states it
+    can reach, so the winning move is found once its value is.
+    """
+    regions = decompose(board)
+    if regions is None:
+        return None
+    color = board.current_player
+    black = color == BLACK
+    try:
+        values = [r.value(r.empty_state(), budget, cached_only) for r in regions]
+        if not cgt.first_player_wins(cgt.total(values), black):
+            return False, NO_POINT
+        for n, region in enumerate(regions):
+            rest = cgt.total(values[:n] + values[n + 1:])
+            state = region.empty_state()
+            for i in region.moves(state, color):
+                after = state[:i] + (color,) + state[i + 1:]
+                value = cgt.add(region.value(after, budget, cached_only), rest)
+                # the opponent moves next and must lose
+                if not cgt.first_player_wins(value, not black):
+                    return True, region.points[i]
+    except _Aborted:
+        return None
+    raise AssertionError("no winning move in a won sum")
@@ -0,0 +1,186 @@
+"""
+safe_moves.py
+Static evaluation of NoGo positions by counting moves.
+
+A point that is illegal for a color stays illegal for it, so the
+points legal for a color now bound the number of moves it can still
+make.
+
+An eye of a color is an empty point whose neighbors on the board are
+all stones of that color. The opponent can never play there: the stone
+would have no liberty, and taking the last liberty of the surrounding
+blocks is a capture. Blocks that share eyes form a group, and the
+owner can always fill all but one of the group's eyes, since the
+filled eye joins its blocks to a block next to another eye of the
+group. If the group also has a liberty where the opponent can never
+play, it can fill all of its eyes. These are the safe moves of the
+color.
+
+With X to move:
+    safe(X) > legal(O): X wins by playing safe moves
+    safe(X) = legal(O): X wins if it has a legal move that leaves its
+        safe moves alone, and plays it first
+    legal(X) <= safe(O): X loses, O answers every move with a safe move
+
+When the counts do not decide the position, counting_result looks the
+regions of the position up in the region cache, see regions.py: the
+value of a region counts the moves each color has left in it, and the
+sum of the values decides the position exactly. The lookup never
+solves a region, a region not in the cache leaves the position open.
+evaluate scores an open position by the counts, see
+heuristic_search.py.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from board_base import BLACK, BORDER, EMPTY, WHITE, GO_POINT, NO_POINT, opponent
+from regions import find_block, solve_by_regions
+
+
+def find_eyes(board) -> Dict[int, Dict[GO_POINT, List[GO_POINT]]]:
+    """
+    The eyes of both colors, each with the stones next to it
+    """
+    b = board.board.tolist()
+    NS = board.NS
+    eyes: Dict[int, Dict[GO_POINT, List[GO_POINT]]] = {BLACK: {}, WHITE: {}}
+    for p in board.get_empty_points().tolist():
+        color = BORDER
+        stones = []
+        for nb in (p - 1, p + 1, p - NS, p + NS):
+            c = b[nb]
+            if c == BORDER:
+                continue
+            if c == EMPTY or (color != BORDER and c != color):
+                break
+            color = c
+            stones.append(nb)
+        else:
+            if color != BORDER:
+                eyes[color][p] = stones
+    return eyes
+
+
+def safe_moves(board, color: int, eyes: Dict[GO_POINT, List[GO_POINT]],
+               reserved: set) -> Tuple[int, GO_POINT]:
+    """
+    Number of safe moves of color given its eyes, and one of them
+    (NO_POINT if there is none).
+    A group can fill all but one of its eyes, or all of them if it has
+    another liberty where the opponent can never play. The eyes and
+    liberties the count relies on are added to reserved.
+    """
+    if not eyes:
+        return 0, NO_POINT
+    b = board.board.tolist()
+    NS = board.NS
+    block_of: Dict[GO_POINT, int] = {}
+    liberties: List[set] = []
+    parent: List[int] = []
+
+    def find(n: int) -> int:
+        while parent[n] != n:
+            parent[n] = parent[parent[n]]
+            n = parent[n]
+        return n
+
+    eye_group: Dict[GO_POINT, int] = {}
+    for eye, stones in eyes.items():
+        root = None
+        for stone in stones:
+            if stone not in block_of:
+                number = len(parent)
+                parent.append(number)
+                liberties.append(find_block(b, NS, stone, number, block_of))
+            n = find(block_of[stone])
+            if root is None:
+                root = n
+            elif n != root:
+                parent[n] = root
+        eye_group[eye] = root
+    groups: Dict[int, List[GO_POINT]] = {}
+    for eye, n in eye_group.items():
+        groups.setdefault(find(n), []).append(eye)
+    group_liberties: Dict[int, set] = {}
+    for n, libs in enumerate(liberties):
+        group_liberties.setdefault(find(n), set()).update(libs)
+    opp = opponent(color)
+    count = 0
+    move = NO_POINT
+    for group, group_eyes in groups.items():
+        safe = len(group_eyes) - 1
+        for lib in group_liberties[group]:
+            if lib not in eyes and not board.is_legal(lib, opp):
+                safe += 1
+                reserved.add(lib)
+                break
+        if safe > 0:
+            count += safe
+            move = group_eyes[0]
+            reserved.update(group_eyes)
+    return count, move
+
+
+def count_legal(board, color: int, limit: int) -> int:
+    """
+    Number of legal moves of color, counting only up to limit
+    """
+    count = 0
+    if limit <= 0:
+        return count
+    for point in board.get_empty_points():
+        if board.is_legal(point, color):
+            count += 1
+            if count == limit:
+                break
+    return count
+
+
+def counting_result(board) -> Optional[Tuple[bool, GO_POINT]]:
+    """
+    (win for the player to move, winning move) if the safe moves or
+    the cached region values decide the position, None otherwise.
+    A color has at most one safe move per eye, so the safe moves are
+    only counted if the other color has few enough legal moves.
+    """
+    color = board.current_player
+    opp = opponent(color)
+    eyes = find_eyes(board)
+    num_eyes = len(eyes[color])
+    if num_eyes > 0:
+        opp_moves = count_legal(board, opp, num_eyes + 1)
+        if opp_moves <= num_eyes:
+            reserved = set()
+            own, move = safe_moves(board, color, eyes[color], reserved)
+            if opp_moves < own:
+                return True, move
+            if opp_moves == own > 0:
+                # a first move that does not use up a safe move buys one more
+                for point in board.get_empty_points():
+                    if point not in reserved and board.is_legal(point, color):
+                        return True, point
+    num_eyes = len(eyes[opp])
+    if num_eyes > 0:
+        moves = count_legal(board, color, num_eyes + 1)
+        if moves <= num_eyes:
+            other, _ = safe_moves(board, opp, eyes[opp], set())
+            if moves <= other:
+                return False, NO_POINT
+    if board.use_regions:
+        return solve_by_regions(board, cached_only=True)
+    return None
+
+
+def evaluate(board) -> int:
+    """
+    Score for the player to move: its legal moves minus the opponent's,
+    plus its safe moves minus the opponent's
+    """
+    color = board.current_player
+    opp = opponent(color)
+    eyes = find_eyes(board)
+    limit = len(board.get_empty_points())
+    legal = count_legal(board, color, limit) - count_legal(board, opp, limit)
+    safe = (safe_moves(board, color, eyes[color], set())[0]
+            - safe_moves(board, opp, eyes[opp], set())[0])
+    return legal + safe
@@ -0,0 +1,143 @@
+"""
+solve_stats.py
+Counters of one solve.
+
+GoBoard.solve fills a SolveStats: the nodes of the search, the positions
+expanded and the moves searched from them, the transposition table
+probes, hits and stores, the deepest position, and the time until the
+first winning root move was proven, which the search records when it
+stores that proof. The time spent in is_legal and in hashing is only
+measured when timing is enabled: reading the clock around every call
+costs about as much as the calls themselves.
+
+The GTP command solve_stats reports the stats of the last solve, and
+with --solve-log every solve appends one JSON line to a file.
+
+Usage as a tool:
+    python3 solve_stats.py summary FILE
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class SolveStats(object):
+    def __init__(self, size: int, to_play: str, timing: bool = False) -> None:
+        self.size: int = size
+        self.to_play: str = to_play
+        # "search", or where a position that was not searched was found:
+        # "proof", "table", "book"; for "parallel" only the root process
+        # is counted, for "distributed" the nodes of all workers, for
+        # "worker" the nodes of the deadline worker until its last report
+        self.source: str = "search"
+        self.result: str = "unknown"
+        self.nodes: int = 0
+        self.expanded: int = 0
+        self.children: int = 0
+        self.max_depth: int = 0
+        self.tt_probes: int = 0
+        self.tt_hits: int = 0
+        self.tt_stores: int = 0
+        self.etc_cutoffs: int = 0
+        self.time: float = 0.0
+        self.time_to_win: Optional[float] = None
+        # not reported: whether the times below are measured, and the
+        # start of the solve
+        self.timing: bool = timing
+        self.start: float = time.time()
+        self.legal_time: float = 0.0
+        self.hash_time: float = 0.0
+
+    def branching(self) -> float:
+        """
+        Average number of moves searched from an expanded position
+        """
+        return self.children / self.expanded if self.expanded else 0.0
+
+    def rate(self) -> float:
+        return self.nodes / self.time if self.time > 0 else 0.0
+
+    def root_won(self) -> None:
+        """
+        Record the time of the first root move proven to win
+        """
+        if self.time_to_win is None:
+            self.time_to_win = time.time() - self.start
+
+    def timed(self, function: Callable, field: str) -> Callable:
+        """
+        function, adding the time of each call to the attribute field
+        """
+        clock = time.perf_counter
+
+        def wrapper(*args):
+            start = clock()
+            try:
+                return function(*args)
+            finally:
+                setattr(self, field, getattr(self, field) + clock() - start)
+        return wrapper
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        The reported counters, without the internal fields and the
+        times that were not measured
+        """
+        data = {name: value for name, value in vars(self).items()
+                if name not in ("timing", "start") and value is not None}
+        data["nodes_per_sec"] = round(self.rate(), 1)
+        data["branching"] = round(self.branching(), 3)
+        if not self.timing:
+            del data["legal_time"]
+            del data["hash_time"]
+        return data
+
+    def summary(self) -> str:
+        """
+        One "name value" line per counter
+        """
+        lines = []
+        for name, value in self.as_dict().items():
+            if isinstance(value, float):
+                value = "{:.4f}".format(value).rstrip("0").rstrip(".")
+            lines.append("{} {}".format(name, value))
+        return "\n".join(lines)
+
+    def log(self, path: str) -> None:
+        """
+        Append the stats to path as one JSON line
+        """
+        record = self.as_dict()
+        record["date"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def read_log(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Summarize a NoGo solve log")
+    parser.add_argument("command", choices=["summary"])
+    parser.add_argument("file")
+    args = parser.parse_args(argv)
+    records = read_log(args.file)
+    by_size: Dict[int, List[Dict[str, Any]]] = {}
+    for record in records:
+        by_size.setdefault(record["size"], []).append(record)
+    for size in sorted(by_size):
+        group = by_size[size]
+        unknown = sum(1 for r in group if r["result"] == "unknown")
+        seconds = sum(r["time"] for r in group)
+        nodes = sum(r["nodes"] for r in group)
+        print("{0}x{0}: {1} solves, {2} unknown, {3:.2f}s, {4} nodes, {5:.0f} nodes/s".format(
+            size, len(group), unknown, seconds, nodes, nodes / seconds if seconds > 0 else 0.0))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
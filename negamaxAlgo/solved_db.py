@@ -0,0 +1,279 @@
+"""
+solved_db.py
+Persistent on-disk database of proven NoGo positions.
+
+The file is a small header followed by fixed-size records
+    key (uint64) | move (int32) | result (int8) | padding
+where key is position_key() of the position, result is 1 if the
+player to move wins and 0 if it loses, and move is the winning move
+(NO_POINT for a loss). Keys are the Zobrist code of the search with the
+board size mixed in, so they are only valid with the ZOBRIST_SEED saved
+in the header.
+
+The first sorted_count records are sorted by key and are searched by
+binary search directly in the memory-mapped file. New results are only
+ever appended after them, so any number of engine processes can read
+the file while one of them writes. Appends and compaction are
+serialized by an flock on a separate lock file, and compaction replaces
+the file atomically, so a reader always sees either the old or the new
+file.
+
+Usage as a tool:
+    python3 solved_db.py info FILE
+    python3 solved_db.py compact FILE
+"""
+
+import argparse
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from board_base import NO_POINT, GO_POINT, SIZE_KEY, ZOBRIST_SEED
+
+MAGIC = b"NOGODB02"
+# magic, record size, zobrist seed, number of sorted records
+HEADER = struct.Struct("<8sIIQ8x")
+HEADER_SIZE = HEADER.size
+RECORD = np.dtype({"names": ["key", "move", "result"],
+                   "formats": ["<u8", "<i4", "i1"],
+                   "offsets": [0, 8, 12],
+                   "itemsize": 16})
+RECORD_SIZE = RECORD.itemsize
+
+
+def position_key(board) -> int:
+    """
+    64 bit key of the position and the player to move: GoBoard.code(),
+    which the search keeps up to date, and the board size
+    """
+    return board.code() ^ SIZE_KEY[board.size]
+
+
+def array_key(size: int, toplay: int, board_array: np.ndarray) -> int:
+    """
+    Key of a position that does not depend on the Zobrist keys,
+    for files that are kept across seeds like the opening books
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(bytes((size, toplay)))
+    h.update(board_array.tobytes())
+    return int.from_bytes(h.digest(), "little")
+
+
+class SolvedDatabase(object):
+    def __init__(self, path: str, readonly: bool = False) -> None:
+        """
+        Open the database at path, creating it if it does not exist.
+        A readonly database never writes to the file.
+        """
+        self.path: str = path
+        self.readonly: bool = readonly
+        self.pending: Dict[int, Tuple[bool, GO_POINT]] = {}
+        self.tail: Dict[int, Tuple[bool, GO_POINT]] = {}
+        self.keys: np.ndarray = np.empty(0, dtype=np.uint64)
+        self.records: np.ndarray = np.empty(0, dtype=RECORD)
+        self.hits: int = 0
+        self._mmap: Optional[mmap.mmap] = None
+        self._file = None
+        self._inode: int = -1
+        self._seen: int = 0
+        self._sorted: int = 0
+        if not os.path.exists(path):
+            if readonly:
+                raise ValueError("solved database {} does not exist".format(path))
+            with self._locked():
+                if not os.path.exists(path):
+                    _write_file(path, np.empty(0, dtype=RECORD))
+        self.refresh()
+
+    def __len__(self) -> int:
+        return self._seen + len(self.pending)
+
+    def close(self) -> None:
+        self.flush()
+        self._unmap()
+
+    def _locked(self) -> '_FileLock':
+        return _FileLock(self.path + ".lock")
+
+    def _unmap(self) -> None:
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.records = np.empty(0, dtype=RECORD)
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def refresh(self) -> None:
+        """
+        Pick up records appended by other processes, and reopen the
+        file if it was replaced by a compaction.
+        Called once per solve, not per lookup.
+        """
+        st = os.stat(self.path)
+        if st.st_ino != self._inode:
+            self._unmap()
+            self.tail = {}
+            self._seen = 0
+            self._file = open(self.path, "rb")
+            self._inode = os.fstat(self._file.fileno()).st_ino
+            header = self._file.read(HEADER_SIZE)
+            magic, record_size, seed, sorted_count = HEADER.unpack(header)
+            if magic != MAGIC or record_size != RECORD_SIZE:
+                raise ValueError("{} is not a solved database".format(self.path))
+            if seed != ZOBRIST_SEED:
+                raise ValueError("{} was saved with Zobrist seed {}".format(self.path, seed))
+            self._sorted = sorted_count
+        count = (os.fstat(self._file.fileno()).st_size - HEADER_SIZE) // RECORD_SIZE
+        if count == self._seen and self._mmap is not None:
+            return
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.records = np.empty(0, dtype=RECORD)
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.records = np.frombuffer(self._mmap, dtype=RECORD,
+                                     count=count, offset=HEADER_SIZE)
+        self.keys = self.records["key"][:self._sorted]
+        for r in self.records[max(self._seen, self._sorted):count]:
+            self.tail.setdefault(int(r["key"]), (bool(r["result"]), GO_POINT(r["move"])))
+        self._seen = count
+
+    def _find(self, key: int) -> Optional[Tuple[bool, GO_POINT]]:
+        entry = self.pending.get(key)
+        if entry is None:
+            entry = self.tail.get(key)
+        if entry is None and self._sorted > 0:
+            i = int(np.searchsorted(self.keys, np.uint64(key)))
+            if i < self._sorted and int(self.keys[i]) == key:
+                r = self.records[i]
+                entry = (bool(r["result"]), GO_POINT(r["move"]))
+        return entry
+
+    def lookup_key(self, key: int) -> Optional[Tuple[bool, GO_POINT]]:
+        entry = self._find(key)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def lookup(self, board) -> Optional[Tuple[bool, GO_POINT]]:
+        """
+        Returns (win for player to move, winning move) if the position
+        of board has been proven, None otherwise.
+        """
+        return self.lookup_key(position_key(board))
+
+    def add(self, board, result: bool, move: GO_POINT = NO_POINT) -> None:
+        """
+        Remember a proven result. It is written to disk by flush().
+        """
+        if self.readonly:
+            return
+        key = position_key(board)
+        if self._find(key) is not None:
+            return
+        if not result:
+            move = NO_POINT
+        self.pending[key] = (result, move)
+
+    def flush(self) -> None:
+        """
+        Append all pending results to the file.
+        """
+        if self.readonly or not self.pending:
+            return
+        records = np.zeros(len(self.pending), dtype=RECORD)
+        for i, (key, (result, move)) in enumerate(self.pending.items()):
+            records[i] = (key, move, 1 if result else 0)
+        with self._locked():
+            with open(self.path, "ab") as f:
+                f.write(records.tobytes())
+        self.pending = {}
+        self.refresh()
+
+
+class _FileLock(object):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.fd = -1
+
+    def __enter__(self) -> '_FileLock':
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+
+
+def _write_file(path: str, records: np.ndarray) -> None:
+    """
+    Atomically replace path by a file holding the given sorted records.
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, RECORD_SIZE, ZOBRIST_SEED, len(records)))
+        f.write(records.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def compact(path: str) -> Tuple[int, int]:
+    """
+    Sort all records and drop duplicate keys.
+    Returns the number of records before and after.
+    """
+    with _FileLock(path + ".lock"):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, record_size, seed, _ = HEADER.unpack(data[:HEADER_SIZE])
+        if magic != MAGIC or record_size != RECORD_SIZE:
+            raise ValueError("{} is not a solved database".format(path))
+        if seed != ZOBRIST_SEED:
+            raise ValueError("{} was saved with Zobrist seed {}".format(path, seed))
+        count = (len(data) - HEADER_SIZE) // RECORD_SIZE
+        records = np.frombuffer(data, dtype=RECORD, count=count, offset=HEADER_SIZE)
+        # stable sort keeps the oldest record of each key first
+        order = np.argsort(records["key"], kind="stable")
+        records = records[order]
+        keep = np.ones(count, dtype=np.bool_)
+        keep[1:] = records["key"][1:] != records["key"][:-1]
+        records = records[keep]
+        _write_file(path, records)
+    return count, len(records)
+
+
+def info(path: str) -> str:
+    db = SolvedDatabase(path, readonly=True)
+    count = len(db.records)
+    wins = int(np.count_nonzero(db.records["result"]))
+    text = "{}: {} records ({} sorted, {} unsorted), {} wins, {} losses".format(
+        path, count, db._sorted, count - db._sorted, wins, count - wins)
+    db.close()
+    return text
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Maintain a NoGo solved-position database")
+    parser.add_argument("command", choices=["info", "compact"])
+    parser.add_argument("file")
+    args = parser.parse_args(argv)
+    if args.command == "compact":
+        before, after = compact(args.file)
+        print("{}: {} records, {} after compaction".format(args.file, before, after))
+    else:
+        print(info(args.file))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,66 @@
+"""
+symmetry.py
+The eight symmetries of a square board (rotations and reflections)
+as permutations of the padded 1D board array, see coord_to_point.
+"""
+
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+from board_base import board_array_size, coord_to_point, GO_POINT
+
+"""
+Number of symmetries of a square board. Symmetry 0 is the identity.
+"""
+NUM_SYMMETRIES: int = 8
+
+
+def transform_coord(t: int, row: int, col: int, size: int) -> Tuple[int, int]:
+    """
+    Apply symmetry t to the 1-based coordinate (row, col).
+    t & 4 transposes, t & 1 flips the rows and t & 2 flips the columns.
+    """
+    if t & 4:
+        row, col = col, row
+    if t & 1:
+        row = size + 1 - row
+    if t & 2:
+        col = size + 1 - col
+    return row, col
+
+
+@lru_cache(maxsize=None)
+def permutations(size: int) -> Tuple[np.ndarray, ...]:
+    """
+    perm[t][p] is the image of array index p under symmetry t.
+    Border points are mapped to themselves.
+    """
+    perms = []
+    for t in range(NUM_SYMMETRIES):
+        perm = np.arange(board_array_size(size), dtype=GO_POINT)
+        for row in range(1, size + 1):
+            for col in range(1, size + 1):
+                r, c = transform_coord(t, row, col, size)
+                perm[coord_to_point(row, col, size)] = coord_to_point(r, c, size)
+        perms.append(perm)
+    return tuple(perms)
+
+
+@lru_cache(maxsize=None)
+def inverse_permutations(size: int) -> Tuple[np.ndarray, ...]:
+    inverses = []
+    for perm in permutations(size):
+        inverse = np.empty_like(perm)
+        inverse[perm] = np.arange(len(perm), dtype=GO_POINT)
+        inverses.append(inverse)
+    return tuple(inverses)
+
+
+def transformed_boards(board_array: np.ndarray, size: int) -> List[np.ndarray]:
+    """
+    The board array under each of the symmetries.
+    A stone on p in board_array is on perm[t][p] in the result t.
+    """
+    return [board_array[inverse] for inverse in inverse_permutations(size)]
@@ -0,0 +1,7 @@
+"""
+Unit tests of the solver modules.
+
+Run from negamaxAlgo:
+    python3 -m unittest discover tests
+    python3 -m pytest -q tests
+"""
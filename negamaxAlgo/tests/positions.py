@@ -0,0 +1,128 @@
+"""
+positions.py
+Test positions, and a brute-force solver to check the search against.
+
+brute_force plays out every legal move with its own legality test on a
+plain list, so it shares no code with the search: no transposition
+table, no illegal marks, no pruning. It is only fast enough for
+positions with about ten empty points.
+"""
+
+import random
+from typing import Dict, List, Tuple
+
+from board_base import BLACK, BORDER, EMPTY, WHITE, opponent, parse_point
+from board import GoBoard
+from board_util import GoBoardUtil
+
+# results of brute_force, by board array and player to move
+_results: Dict[Tuple[Tuple[int, ...], int], bool] = {}
+
+
+def position(moves: str, size: int = 4) -> GoBoard:
+    board = GoBoard(size)
+    for point in moves.split():
+        board.play_move(parse_point(point, size), board.current_player)
+    return board
+
+
+def random_positions(size: int, empty: int, count: int, seed: int = 0) -> List[GoBoard]:
+    """
+    count positions of random games, each stopped when empty points are
+    left or the player to move has no legal move
+    """
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        board = GoBoard(size)
+        while len(board.get_empty_points()) > empty:
+            moves = GoBoardUtil.generate_legal_moves(board, board.current_player)
+            if not moves:
+                break
+            board.play_move(rng.choice(moves), board.current_player)
+        board.clear_illegal()
+        boards.append(board)
+    return boards
+
+
+def _has_liberty(b: List[int], NS: int, stone: int) -> bool:
+    color = b[stone]
+    marked = {stone}
+    stack = [stone]
+    while stack:
+        p = stack.pop()
+        for nb in (p - 1, p + 1, p - NS, p + NS):
+            if b[nb] == EMPTY:
+                return True
+            if b[nb] == color and nb not in marked:
+                marked.add(nb)
+                stack.append(nb)
+    return False
+
+
+def legal_moves(b: List[int], NS: int, color: int) -> List[int]:
+    """
+    The points where color can play without capturing or suicide
+    """
+    moves = []
+    opp = opponent(color)
+    for p, c in enumerate(b):
+        if c != EMPTY:
+            continue
+        b[p] = color
+        legal = _has_liberty(b, NS, p) and not any(
+            b[nb] == opp and not _has_liberty(b, NS, nb) for nb in (p - 1, p + 1, p - NS, p + NS))
+        b[p] = EMPTY
+        if legal:
+            moves.append(p)
+    return moves
+
+
+def brute_force(board: GoBoard) -> bool:
+    """
+    Whether the player to move wins
+    """
+    b = [int(c) for c in board.board]
+    assert all(c in (EMPTY, BLACK, WHITE, BORDER) for c in b)
+    return _wins(b, board.NS, board.current_player)
+
+
+def _wins(b: List[int], NS: int, color: int) -> bool:
+    key = (tuple(b), color)
+    result = _results.get(key)
+    if result is None:
+        result = False
+        for p in legal_moves(b, NS, color):
+            b[p] = color
+            lost = not _wins(b, NS, opponent(color))
+            b[p] = EMPTY
+            if lost:
+                result = True
+                break
+        _results[key] = result
+    return result
+
+
+def solve(board: GoBoard, **options) -> Tuple[bool, int]:
+    """
+    (win, winning move) of a solve of a copy of board with the given
+    GoBoard options and a fresh transposition table
+    """
+    board = board.copy()
+    for name, value in options.items():
+        setattr(board, name, value)
+    win, time_ended, move = board.solve(board.current_player, 60)
+    assert not time_ended
+    return win, move
+
+
+def wins_with(board: GoBoard, move: int) -> bool:
+    """
+    Whether move is legal for the player to move and wins
+    """
+    b = [int(c) for c in board.board]
+    color = board.current_player
+    if move not in legal_moves(b, board.NS, color):
+        return False
+    b[move] = color
+    return not _wins(b, board.NS, opponent(color))
@@ -0,0 +1,66 @@
+"""
+test_budget.py
+Search budgets, and aborted searches that must not store results.
+"""
+
+import unittest
+
+from board import transpositiontable
+from budget import ABORTED, SearchBudget
+from tests.positions import brute_force, random_positions
+
+
+class RecordingTable(transpositiontable):
+    """
+    A transposition table that keeps each stored position to check it
+    """
+    def __init__(self, board) -> None:
+        super().__init__()
+        self.board = board
+        self.stored = []
+
+    def store(self, code, score, move=-1):
+        board = self.board.copy()
+        self.stored.append((board, score))
+        super().store(code, score, move)
+
+
+class SearchBudgetTest(unittest.TestCase):
+    def test_aborted_is_a_miss(self):
+        self.assertIsNone(ABORTED)
+
+    def test_node_limit(self):
+        budget = SearchBudget(max_nodes=300, check_interval=100)
+        ticks = 0
+        while not budget.tick():
+            ticks += 1
+        self.assertEqual(budget.reason, "nodes")
+        self.assertEqual(ticks, 299)
+
+    def test_time_limit(self):
+        budget = SearchBudget(timelimit=0)
+        budget.check()
+        self.assertTrue(budget.expired)
+        self.assertEqual(budget.reason, "time")
+        budget.finish()
+
+
+class AbortedSearchTest(unittest.TestCase):
+    def test_only_proofs_are_stored(self):
+        for board in random_positions(4, 11, 12, seed=29):
+            expected = brute_force(board)
+            for max_nodes in (50, 200, 1000):
+                search = board.copy()
+                search.table = RecordingTable(search)
+                search.max_nodes = max_nodes
+                win, time_ended, _ = search.solve(search.current_player, 60)
+                if time_ended:
+                    self.assertIsNone(search.table.lookup(search.code()))
+                else:
+                    self.assertEqual(win, expected)
+                for stored, score in search.table.stored:
+                    self.assertEqual(score, brute_force(stored))
+
+
+if __name__ == "__main__":
+    unittest.main()
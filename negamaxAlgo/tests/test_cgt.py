@@ -0,0 +1,78 @@
+"""
+test_cgt.py
+Canonical forms of small games and of NoGo regions.
+"""
+
+import unittest
+
+import cgt
+from board_base import BLACK, WHITE
+from regions import RegionGame, _DEAD, _EDGE, _LIVE, _SAFE
+
+
+def integer(n: int) -> cgt.Game:
+    g = cgt.ZERO
+    for _ in range(abs(n)):
+        g = cgt.make([g], []) if n > 0 else cgt.make([], [g])
+    return g
+
+
+class CanonicalFormTest(unittest.TestCase):
+    def test_integers(self):
+        self.assertEqual(cgt.integer_value(integer(3)), 3)
+        self.assertEqual(cgt.integer_value(integer(-2)), -2)
+        self.assertIs(cgt.neg(integer(2)), integer(-2))
+
+    def test_dominated_option_is_removed(self):
+        # {0, 1 |} = {1 |} = 2
+        self.assertIs(cgt.make([cgt.ZERO, integer(1)], []), integer(2))
+
+    def test_reversible_options_are_bypassed(self):
+        # {* | *} = 0: each move to * is answered by the move to 0
+        self.assertIs(cgt.make([cgt.STAR], [cgt.STAR]), cgt.ZERO)
+
+    def test_sums(self):
+        self.assertIs(cgt.add(cgt.STAR, cgt.STAR), cgt.ZERO)
+        self.assertIs(cgt.add(integer(2), integer(-3)), integer(-1))
+        self.assertIs(cgt.total([integer(1), cgt.STAR, integer(-1)]), cgt.STAR)
+
+    def test_first_player_wins(self):
+        self.assertTrue(cgt.first_player_wins(cgt.STAR, True))
+        self.assertTrue(cgt.first_player_wins(cgt.STAR, False))
+        self.assertFalse(cgt.first_player_wins(cgt.ZERO, True))
+        self.assertTrue(cgt.first_player_wins(integer(1), True))
+        self.assertFalse(cgt.first_player_wins(integer(1), False))
+
+    def test_closure_rebuilds_the_same_games(self):
+        g = cgt.make([integer(1)], [cgt.STAR])
+        games = cgt.closure([g])
+        index = {h.uid: i for i, h in enumerate(games)}
+        options = [([index[o.uid] for o in h.left], [index[o.uid] for o in h.right])
+                   for h in games]
+        self.assertIs(cgt.rebuild(options)[-1], g)
+
+
+class RegionValueTest(unittest.TestCase):
+    def value(self, neighbors) -> cgt.Game:
+        region = RegionGame(list(range(len(neighbors))), neighbors)
+        return region.value(region.empty_state())
+
+    def test_open_point_is_star(self):
+        # a point either color can fill
+        self.assertIs(self.value([((_EDGE,), (_EDGE,), (_DEAD,), (_DEAD,))]), cgt.STAR)
+
+    def test_eye_counts_one_move(self):
+        # an eye of Black: only Black can play there
+        black = self.value([((_SAFE, BLACK),) * 4])
+        white = self.value([((_SAFE, WHITE),) * 4])
+        self.assertIs(black, integer(1))
+        self.assertIs(white, integer(-1))
+
+    def test_two_open_points_are_zero(self):
+        # {* | *}: the second player takes the last point
+        self.assertIs(self.value([((_LIVE, 1), (_EDGE,), (_DEAD,), (_DEAD,)),
+                                  ((_LIVE, 0), (_EDGE,), (_DEAD,), (_DEAD,))]), cgt.ZERO)
+
+
+if __name__ == "__main__":
+    unittest.main()
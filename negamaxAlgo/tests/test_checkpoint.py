@@ -0,0 +1,72 @@
+"""
+test_checkpoint.py
+Saving, loading and resuming checkpoints of a solve.
+"""
+
+import os
+import tempfile
+import unittest
+
+from board_base import NO_POINT
+from board import GoBoard
+from checkpoint import Checkpoint, checkpointed_solve, resume, save_checkpoint
+from tests.positions import brute_force, random_positions, wins_with
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "solve.ckpt")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        for board in random_positions(5, 11, 4, seed=45):
+            search = board.copy()
+            win, _, move = search.solve(search.current_player, 60)
+            board.table = search.table
+            save_checkpoint(self.path, board, 1234, 5.5, win, move)
+            checkpoint = Checkpoint(self.path)
+            self.assertEqual((checkpoint.size, checkpoint.toplay), (5, board.current_player))
+            self.assertEqual((checkpoint.nodes, checkpoint.seconds), (1234, 5.5))
+            self.assertEqual(checkpoint.result, win)
+            self.assertEqual(checkpoint.move, move)
+            restored = GoBoard(7)
+            checkpoint.restore(restored)
+            self.assertEqual(restored.board.tolist(), board.board.tolist())
+            self.assertEqual(restored.code(), board.code())
+            self.assertEqual(restored.table.table, search.table.table)
+            won = {code: move for code, move in search.table.moves.items()
+                   if search.table.table.get(code) and move != NO_POINT}
+            self.assertEqual({code: move for code, move in restored.table.moves.items()
+                              if move != NO_POINT}, won)
+
+    def test_resume(self):
+        for board in random_positions(5, 12, 4, seed=45):
+            search = board.copy()
+            search.max_nodes = 300
+            _, time_ended, _ = checkpointed_solve(search, self.path, 60)
+            self.assertTrue(time_ended)
+            checkpoint = Checkpoint(self.path)
+            self.assertIsNone(checkpoint.result)
+            first = checkpoint.nodes
+            self.assertGreaterEqual(first, 300)
+            resumed = GoBoard(board.size)
+            win, time_ended, move = resume(resumed, self.path, 60)
+            self.assertFalse(time_ended)
+            self.assertEqual(win, brute_force(board))
+            if win:
+                self.assertTrue(wins_with(board, move))
+            checkpoint = Checkpoint(self.path)
+            self.assertEqual(checkpoint.result, win)
+            self.assertGreater(checkpoint.nodes, first)
+
+    def test_no_save_at_end(self):
+        board = random_positions(4, 10, 1, seed=45)[0]
+        checkpointed_solve(board, self.path, 60, save_at_end=False)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+test_etc.py
+Enhanced transposition cutoffs, against brute force.
+"""
+
+import unittest
+
+from tests.positions import brute_force, random_positions, wins_with
+
+
+class EtcTest(unittest.TestCase):
+    def test_solve(self):
+        cutoffs = 0
+        for size in (4, 5):
+            for board in random_positions(size, 11, 6, seed=39):
+                search = board.copy()
+                search.use_etc = True
+                win, time_ended, move = search.solve(search.current_player, 60)
+                self.assertFalse(time_ended)
+                self.assertEqual(win, brute_force(board))
+                if win:
+                    self.assertTrue(wins_with(board, move))
+                self.assertLessEqual(search.etc_cutoffs, search.etc_probes)
+                cutoffs += search.etc_cutoffs
+        self.assertGreater(cutoffs, 0)
+
+    def test_cutoff_move_wins(self):
+        # the children stored lost for the opponent, those a cutoff
+        # plays, are winning moves
+        checked = 0
+        for board in random_positions(5, 11, 4, seed=390):
+            search = board.copy()
+            search.use_etc = True
+            search.solve(search.current_player, 60)
+            table = search.table
+            for move in search.get_empty_points():
+                if not search.is_legal(move, search.current_player):
+                    continue
+                search.makeMove(move, board.current_player)
+                if table.lookup(search.code()) is False:
+                    self.assertTrue(wins_with(board, move))
+                    checked += 1
+                search.undoMove(move, board.current_player)
+        self.assertGreater(checked, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+test_illegal_trail.py
+Illegal marks set under makeMove are taken back by undoMove.
+"""
+
+import random
+import unittest
+
+from board_base import BLACK, WHITE
+from board_util import GoBoardUtil
+from tests.positions import brute_force, legal_moves, random_positions, solve
+
+
+def snapshot(board):
+    return (board.board.copy().tolist(), [list(marks) for marks in board.illegal],
+            list(board.illegal_trail), list(board.trail_marks), board.code())
+
+
+class IllegalTrailTest(unittest.TestCase):
+    def check_line(self, board, rng, depth):
+        color = board.current_player
+        moves = GoBoardUtil.generate_legal_moves(board, color)
+        b = [int(c) for c in board.board]
+        self.assertEqual(sorted(moves), legal_moves(b, board.NS, color))
+        if depth == 0 or not moves:
+            return
+        before = snapshot(board)
+        for move in rng.sample(moves, min(2, len(moves))):
+            board.makeMove(move, color)
+            self.check_line(board, rng, depth - 1)
+            board.undoMove(move, color)
+            self.assertEqual(snapshot(board), before)
+
+    def test_make_undo(self):
+        rng = random.Random(34)
+        for board in random_positions(5, 14, 5, seed=34):
+            self.check_line(board, rng, 5)
+
+    def test_solve_restores_board(self):
+        for board in random_positions(4, 10, 10, seed=34):
+            search = board.copy()
+            search.solve(search.current_player, 60)
+            # marks found at the root itself stay, they must be right
+            self.assertEqual(search.board.tolist(), board.board.tolist())
+            self.assertEqual(search.trail_marks, [])
+            self.assertEqual(search.code(), board.code())
+            b = [int(c) for c in board.board]
+            for color in (BLACK, WHITE):
+                for point in legal_moves(b, board.NS, color):
+                    self.assertFalse(search.illegal[color][point])
+            self.assertEqual(solve(board)[0], brute_force(board))
+
+
+if __name__ == "__main__":
+    unittest.main()
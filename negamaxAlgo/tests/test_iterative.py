@@ -0,0 +1,55 @@
+"""
+test_iterative.py
+The iterative search against the recursive one and brute force.
+"""
+
+import unittest
+
+from tests.positions import brute_force, random_positions, wins_with
+
+
+def solve_counted(board, **options):
+    board = board.copy()
+    for name, value in options.items():
+        setattr(board, name, value)
+    win, time_ended, move = board.solve(board.current_player, 60)
+    assert not time_ended
+    return win, move, board.stats.nodes, board.stats.expanded
+
+
+class IterativeTest(unittest.TestCase):
+    def test_same_search(self):
+        # the region value cache is shared by all solves, so searches
+        # with regions only visit the same nodes on a fresh cache
+        for size in (4, 5):
+            for board in random_positions(size, 11, 6, seed=38):
+                iterative = solve_counted(board, iterative=True, use_regions=False)
+                recursive = solve_counted(board, iterative=False, use_regions=False)
+                self.assertEqual(iterative, recursive)
+                self.assertEqual(iterative[0], brute_force(board))
+                if iterative[0]:
+                    self.assertTrue(wins_with(board, iterative[1]))
+
+    def test_same_result(self):
+        for board in random_positions(5, 11, 6, seed=380):
+            expected = brute_force(board)
+            for iterative in (True, False):
+                win, move, _, _ = solve_counted(board, iterative=iterative)
+                self.assertEqual(win, expected)
+                if win:
+                    self.assertTrue(wins_with(board, move))
+
+    def test_aborted(self):
+        for board in random_positions(5, 12, 4, seed=38):
+            for iterative in (True, False):
+                search = board.copy()
+                search.iterative = iterative
+                search.max_nodes = 100
+                _, time_ended, _ = search.solve(search.current_player, 60)
+                self.assertTrue(time_ended)
+                self.assertEqual(search.board.tolist(), board.board.tolist())
+                self.assertEqual(search.trail_marks, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+test_move_order.py
+Move orders change the search, never its result.
+"""
+
+import random
+import unittest
+
+from board_util import GoBoardUtil
+from move_order import MOVE_ORDERS, order_moves, pattern_codes
+from tests.positions import brute_force, random_positions, solve, wins_with
+
+
+class MoveOrderTest(unittest.TestCase):
+    def test_solve(self):
+        for size in (4, 5):
+            for board in random_positions(size, 11, 4, seed=50):
+                expected = brute_force(board)
+                for order in MOVE_ORDERS:
+                    win, move = solve(board, move_order=order)
+                    self.assertEqual(win, expected, order)
+                    if win:
+                        self.assertTrue(wins_with(board, move), order)
+
+    def test_order_is_permutation(self):
+        for board in random_positions(5, 15, 5, seed=50):
+            points = board.get_empty_points()
+            for order in MOVE_ORDERS:
+                board.move_order = order
+                ordered = order_moves(board, board.current_player, points)
+                self.assertEqual(sorted(ordered.tolist()), sorted(points.tolist()))
+
+    def check_codes(self, board):
+        # only the codes of empty points are read
+        points = board.get_empty_points()
+        self.assertEqual(board.pattern_codes()[points].tolist(),
+                         pattern_codes(board.board, board.size)[points].tolist())
+
+    def test_pattern_update(self):
+        # the codes updated by makeMove and undoMove match fresh codes
+        rng = random.Random(50)
+        for board in random_positions(5, 20, 5, seed=50):
+            board.pattern_codes()
+            played = []
+            for _ in range(6):
+                moves = GoBoardUtil.generate_legal_moves(board, board.current_player)
+                if not moves:
+                    break
+                move = rng.choice(moves)
+                played.append((move, board.current_player))
+                board.makeMove(move, board.current_player)
+                self.check_codes(board)
+            for move, color in reversed(played):
+                board.undoMove(move, color)
+                self.check_codes(board)
+
+
+if __name__ == "__main__":
+    unittest.main()
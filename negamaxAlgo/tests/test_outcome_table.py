@@ -0,0 +1,67 @@
+"""
+test_outcome_table.py
+The 3x3 outcome table against the search solver.
+"""
+
+import os
+import tempfile
+import unittest
+
+from board_base import BLACK, NO_POINT, WHITE
+from board import GoBoard
+from board_util import GoBoardUtil
+from outcome_table import OutcomeTable, build_table, check_table
+
+
+class OutcomeTableTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "outcomes3.bin")
+            cls.count = build_table(3, path)
+            cls.table = OutcomeTable(path)
+
+    def test_header(self):
+        self.assertEqual(self.table.size, 3)
+        self.assertEqual(len(self.table), self.count)
+
+    def test_agrees_with_search(self):
+        """
+        Every position up to two moves deep, in every orientation
+        """
+        boards = [GoBoard(3)]
+        for _ in range(2):
+            children = []
+            for board in boards:
+                color = board.current_player
+                for move in GoBoardUtil.generate_legal_moves(board, color):
+                    child = board.copy()
+                    child.play_move(move, color)
+                    children.append(child)
+            boards += children
+        for board in boards:
+            result, move = self.table.lookup(board)
+            win, time_ended, _ = board.copy().solve(board.current_player, 60)
+            self.assertFalse(time_ended)
+            self.assertEqual(result, win)
+            if result:
+                # the move of the table wins in the orientation of board
+                board.play_move(move, board.current_player)
+                self.assertFalse(board.solve(board.current_player, 60)[0])
+            else:
+                self.assertEqual(move, NO_POINT)
+
+    def test_unreachable_position(self):
+        board = GoBoard(3)
+        board.current_player = WHITE
+        self.assertIsNone(self.table.lookup(board))
+        self.assertIsNone(self.table.lookup(GoBoard(4)))
+        board.current_player = BLACK
+        self.assertIsNotNone(self.table.lookup(board))
+
+    def test_check_table(self):
+        self.assertEqual(check_table(self.table, 20, 60, seed=1), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+test_proof_tree.py
+Proofs read from the table after a solve, against brute force.
+"""
+
+import unittest
+
+from board_base import opponent
+from board_util import GoBoardUtil
+from proof_tree import extract_proof
+from tests.positions import brute_force, random_positions, wins_with
+
+
+def solved(board, **options):
+    board = board.copy()
+    for name, value in options.items():
+        setattr(board, name, value)
+    board.solve(board.current_player, 60)
+    return board
+
+
+class ProofTreeTest(unittest.TestCase):
+    def walk(self, board, proof, complete):
+        """
+        Follow the proof through every defence, checking each move of
+        the proof with brute force. Returns the number of positions
+        visited, transpositions counted each time.
+        """
+        move = proof.lookup(board)
+        if move is None:
+            self.assertFalse(complete)
+            return 0
+        self.assertTrue(wins_with(board, move))
+        winner = board.current_player
+        count = 1
+        board.makeMove(move, winner)
+        for reply in GoBoardUtil.generate_legal_moves(board, opponent(winner)):
+            board.makeMove(reply, opponent(winner))
+            count += self.walk(board, proof, complete)
+            board.undoMove(reply, opponent(winner))
+        board.undoMove(move, winner)
+        return count
+
+    def test_complete_proof(self):
+        # without regions and pruned eye fills every defence was searched
+        wins = 0
+        for size in (4, 5):
+            for board in random_positions(size, 11, 6, seed=44):
+                search = solved(board, use_regions=False, use_tempo=False)
+                proof = extract_proof(search)
+                if not brute_force(board):
+                    self.assertIsNone(proof.lookup(board))
+                    continue
+                wins += 1
+                self.walk(board.copy(), proof, True)
+        self.assertGreater(wins, 0)
+
+    def test_sound_proof(self):
+        for board in random_positions(5, 11, 6, seed=440):
+            proof = extract_proof(solved(board))
+            if brute_force(board):
+                self.assertGreater(self.walk(board.copy(), proof, False), 0)
+
+    def test_cleared_table(self):
+        for board in random_positions(4, 11, 4, seed=44):
+            search = solved(board)
+            proof = extract_proof(search)
+            search.table.clear()
+            if brute_force(board):
+                self.assertTrue(wins_with(board, proof.lookup(search)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+test_region_cache.py
+Lookups and saved files of the region value cache.
+"""
+
+import os
+import tempfile
+import unittest
+
+from region_cache import RegionCache, state_code
+from regions import region_values, solve_by_regions
+from tests.test_regions import SPLIT_POSITIONS, position
+
+
+class RegionCacheTest(unittest.TestCase):
+    def setUp(self):
+        region_values.clear()
+
+    def test_state_code(self):
+        self.assertEqual(state_code((0, 0, 0)), 0)
+        self.assertEqual(state_code((1, 2, 0)), 1 + 2 * 3)
+
+    def test_symmetric_regions_share_values(self):
+        # the same positions mirrored left to right
+        mirror = {c: m for c, m in zip("abcde", "edcba")}
+        for moves in SPLIT_POSITIONS:
+            solve_by_regions(position(moves))
+        count = len(region_values)
+        for moves in SPLIT_POSITIONS:
+            mirrored = " ".join(mirror[p[0]] + p[1:] for p in moves.split())
+            self.assertIsNotNone(solve_by_regions(position(mirrored)), mirrored)
+        self.assertEqual(len(region_values), count)
+
+    def test_cached_only_needs_all_regions(self):
+        board = position(SPLIT_POSITIONS[0])
+        self.assertIsNone(solve_by_regions(board, cached_only=True))
+        answer = solve_by_regions(board)
+        self.assertEqual(solve_by_regions(board, cached_only=True), answer)
+
+    def test_cache_round_trip(self):
+        for moves in SPLIT_POSITIONS:
+            solve_by_regions(position(moves))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "regions.bin")
+            region_values.save(path)
+            cache = RegionCache()
+            self.assertEqual(cache.load(path), len(region_values))
+        self.assertEqual(cache.keys, region_values.keys)
+        self.assertEqual(cache.values, region_values.values)
+
+
+if __name__ == "__main__":
+    unittest.main()
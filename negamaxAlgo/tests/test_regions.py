@@ -0,0 +1,61 @@
+"""
+test_regions.py
+Region decomposition and the sum of the regions against the search.
+"""
+
+import unittest
+
+from board_base import NO_POINT, parse_point
+from board import GoBoard
+from regions import decompose, region_values, solve_by_regions
+
+"""
+5x5 positions from random games that split into two regions.
+"""
+SPLIT_POSITIONS = [
+    "a5 c2 c5 d5 b4 c3 a2 b1 b5 d2 e4 a3 d4 b2 a4",
+    "d5 d4 d3 a5 d2 d1 c4 e4 b5 b4 b2 c2 c1 c3 b1",
+    "e3 b2 a2 d1 b1 e5 d5 d3 d4 c3 b3 c5 c4 c1",
+    "e1 d3 a2 a3 d5 c5 d2 c3 c4 b3 a1 e4 b1 d4",
+]
+
+
+def position(moves: str, size: int = 5) -> GoBoard:
+    board = GoBoard(size)
+    for point in moves.split():
+        board.play_move(parse_point(point, size), board.current_player)
+    return board
+
+
+def search(board: GoBoard) -> bool:
+    board = board.copy()
+    board.use_regions = False
+    win, time_ended, _ = board.solve(board.current_player, 60)
+    assert not time_ended
+    return win
+
+
+class RegionTest(unittest.TestCase):
+    def setUp(self):
+        region_values.clear()
+
+    def test_positions_split(self):
+        for moves in SPLIT_POSITIONS:
+            regions = decompose(position(moves))
+            self.assertIsNotNone(regions, moves)
+            self.assertEqual(len(regions), 2, moves)
+
+    def test_sum_agrees_with_search(self):
+        for moves in SPLIT_POSITIONS:
+            board = position(moves)
+            win, move = solve_by_regions(board)
+            self.assertEqual(win, search(board), moves)
+            if win:
+                board.play_move(move, board.current_player)
+                self.assertFalse(search(board), moves)
+            else:
+                self.assertEqual(move, NO_POINT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""
+test_safe_moves.py
+Counting results and solves with safe moves, against brute force.
+"""
+
+import unittest
+
+from safe_moves import counting_result
+from tests.positions import brute_force, random_positions, solve, wins_with
+
+
+class CountingResultTest(unittest.TestCase):
+    def test_decided_positions(self):
+        decided = 0
+        for size, empty in ((4, 3), (4, 5), (5, 5), (5, 7)):
+            for board in random_positions(size, empty, 100, seed=33):
+                board.use_regions = False
+                result = counting_result(board)
+                if result is None:
+                    continue
+                decided += 1
+                win, move = result
+                self.assertEqual(win, brute_force(board))
+                if win:
+                    self.assertTrue(wins_with(board, move))
+        self.assertGreater(decided, 10)
+
+
+class SafeMoveSolveTest(unittest.TestCase):
+    def test_solve(self):
+        for size, empty in ((4, 10), (5, 10)):
+            for board in random_positions(size, empty, 10, seed=33):
+                win, move = solve(board, use_safe_moves=True)
+                self.assertEqual(win, brute_force(board))
+                if win:
+                    self.assertTrue(wins_with(board, move))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+test_solve_all.py
+Classification of every root move, against brute force.
+"""
+
+import unittest
+
+from tests.positions import legal_moves, random_positions, wins_with
+from tests.test_symmetry import symmetric_positions
+from tests.test_tempo import positions as tempo_positions
+
+
+class SolveAllTest(unittest.TestCase):
+    def check(self, board, timelimit=60):
+        search = board.copy()
+        classified = search.solveAll(search.current_player, timelimit)
+        moves = [move for move, _, _ in classified]
+        b = [int(c) for c in board.board]
+        self.assertEqual(sorted(moves), legal_moves(b, board.NS, board.current_player))
+        self.assertEqual(search.board.tolist(), board.board.tolist())
+        unknown = 0
+        for move, status, _ in classified:
+            if status == "unknown":
+                unknown += 1
+            else:
+                self.assertEqual(status, "win" if wins_with(board, move) else "loss")
+        return unknown
+
+    def test_all_moves(self):
+        boards = (random_positions(4, 11, 5, seed=47) + symmetric_positions(4, 11, 5, seed=47)
+                  + tempo_positions()[:6])
+        for board in boards:
+            self.assertEqual(self.check(board), 0)
+
+    def test_no_time(self):
+        for board in random_positions(5, 12, 2, seed=47):
+            b = [int(c) for c in board.board]
+            moves = legal_moves(b, board.NS, board.current_player)
+            self.assertEqual(self.check(board, 0), len(moves))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+test_solved_db.py
+Round trip, deduplication and compaction of the solved database.
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from board_base import NO_POINT, parse_point
+from board import SOLVED_DB_DEPTH, GoBoard
+from board_util import GoBoardUtil
+from solved_db import SolvedDatabase, compact, position_key
+
+
+def shallow_keys(board: GoBoard, depth: int) -> set:
+    """
+    Keys of the positions at most depth moves after board
+    """
+    keys = {position_key(board)}
+    if depth > 0:
+        color = board.current_player
+        for move in GoBoardUtil.generate_legal_moves(board, color):
+            board.makeMove(move, color)
+            keys |= shallow_keys(board, depth - 1)
+            board.undoMove(move, color)
+    return keys
+
+
+def position(moves: str, size: int = 4) -> GoBoard:
+    board = GoBoard(size)
+    for point in moves.split():
+        board.play_move(parse_point(point, size), board.current_player)
+    return board
+
+
+class SolvedDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "solved.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        won, lost = position("b2"), position("b2 c3")
+        db = SolvedDatabase(self.path)
+        db.add(won, True, parse_point("c2", 4))
+        db.add(lost, False, parse_point("a1", 4))
+        self.assertEqual(db.lookup(won), (True, parse_point("c2", 4)))
+        db.close()
+        db = SolvedDatabase(self.path, readonly=True)
+        self.assertEqual(len(db), 2)
+        self.assertEqual(db.lookup(won), (True, parse_point("c2", 4)))
+        # a lost position has no move
+        self.assertEqual(db.lookup(lost), (False, NO_POINT))
+        self.assertIsNone(db.lookup(position("a1")))
+        db.close()
+
+    def test_key_depends_on_size_and_player(self):
+        keys = {position_key(GoBoard(size)) for size in (3, 4, 5)}
+        self.assertEqual(len(keys), 3)
+        board = GoBoard(4)
+        board.current_player = 3 - board.current_player
+        self.assertNotEqual(position_key(board), position_key(GoBoard(4)))
+
+    def test_duplicates_are_not_written(self):
+        board = position("b2")
+        db = SolvedDatabase(self.path)
+        db.add(board, True, parse_point("c2", 4))
+        db.add(board, True, parse_point("c2", 4))
+        db.flush()
+        db.add(board, True, parse_point("c3", 4))
+        db.close()
+        db = SolvedDatabase(self.path)
+        db.add(board, True, parse_point("c3", 4))
+        db.close()
+        self.assertEqual(len(SolvedDatabase(self.path, readonly=True).records), 1)
+
+    def test_compact_sorts_and_keeps_the_first_record(self):
+        boards = [position(moves) for moves in ("a1", "b2", "c3", "d4")]
+        first, second = SolvedDatabase(self.path), SolvedDatabase(self.path)
+        for board in boards:
+            first.add(board, True, parse_point("a2", 4))
+        first.flush()
+        # second read the file before first wrote to it
+        second.add(boards[0], True, parse_point("b3", 4))
+        second.flush()
+        self.assertEqual(compact(self.path), (5, 4))
+        db = SolvedDatabase(self.path, readonly=True)
+        self.assertEqual(db._sorted, 4)
+        self.assertTrue(np.all(np.diff(db.keys.astype(np.float64)) > 0))
+        for board in boards:
+            self.assertEqual(db.lookup(board), (True, parse_point("a2", 4)))
+        db.close()
+
+    def test_solve_keeps_shallow_results(self):
+        board = GoBoard(3)
+        board.solved_db = SolvedDatabase(self.path)
+        win, time_ended, move = board.solve(board.current_player, 60)
+        self.assertFalse(time_ended)
+        board.solved_db.close()
+        db = SolvedDatabase(self.path, readonly=True)
+        self.assertEqual(db.lookup(GoBoard(3)), (win, move if win else NO_POINT))
+        stored = {int(key) for key in db.records["key"]}
+        self.assertTrue(stored <= shallow_keys(GoBoard(3), SOLVED_DB_DEPTH))
+        # a second solve is answered from the file
+        board = GoBoard(3)
+        board.solved_db = db
+        self.assertEqual(board.solve(board.current_player, 60), (win, False, move))
+        self.assertGreater(db.hits, 0)
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+test_symmetry.py
+Symmetry pruning of the root and inner moves, against brute force.
+"""
+
+import random
+import unittest
+
+from board_base import BLACK, EMPTY, WHITE
+from board import GoBoard
+from tests.positions import brute_force, position, solve, wins_with
+
+
+def symmetric_positions(size, empty, count, seed=0):
+    """
+    count positions mapped onto themselves by a random reflection or
+    half turn of the board, with at most empty empty points
+    """
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = GoBoard(size)
+        perms = [perm for perm in board.sym_perms
+                 if all(perm[perm[p]] == p for p in board.get_empty_points())]
+        perm = rng.choice(perms)
+        tries = 0
+        while len(board.get_empty_points()) > empty and tries < 100:
+            tries += 1
+            point = rng.choice(list(board.get_empty_points()))
+            color = rng.choice((BLACK, WHITE))
+            pair = {point, perm[point]}
+            for p in pair:
+                board.board[p] = color
+            if not all(board._block_has_liberty(p) for p in pair):
+                for p in pair:
+                    board.board[p] = EMPTY
+        board.current_player = rng.choice((BLACK, WHITE))
+        board.rehash()
+        if len(board.get_empty_points()) <= empty:
+            boards.append(board)
+    return boards
+
+
+class SymmetryTest(unittest.TestCase):
+    def test_symmetries(self):
+        self.assertEqual(len(GoBoard(4).symmetries()), 7)
+        # both stones on the diagonal a1-d4
+        self.assertEqual(len(position("a1 c3").symmetries()), 1)
+        self.assertEqual(position("a1 b1").symmetries(), [])
+
+    def test_symmetric_positions(self):
+        for board in symmetric_positions(4, 11, 10, seed=36):
+            self.assertTrue(board.symmetries())
+            expected = brute_force(board)
+            for use_symmetry in (True, False):
+                win, move = solve(board, use_symmetry=use_symmetry)
+                self.assertEqual(win, expected)
+                if win:
+                    self.assertTrue(wins_with(board, move))
+
+    def test_empty_board(self):
+        board = GoBoard(3)
+        win, move = solve(board, use_symmetry=True)
+        self.assertEqual(win, brute_force(board))
+        if win:
+            self.assertTrue(wins_with(board, move))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+test_tempo.py
+Pruning of equivalent eye fills, against brute force.
+"""
+
+import unittest
+
+from board_base import BLACK, WHITE, parse_point
+from board import GoBoard
+from tests.positions import brute_force, random_positions, solve, wins_with
+
+
+def setup(black, white, size=4, toplay=BLACK):
+    board = GoBoard(size)
+    for point in black.split():
+        board.board[parse_point(point, size)] = BLACK
+    for point in white.split():
+        board.board[parse_point(point, size)] = WHITE
+    board.current_player = toplay
+    board.rehash()
+    return board
+
+
+def positions():
+    boards = []
+    for toplay in (BLACK, WHITE):
+        boards.append(setup("b1 b2 b3 b4 a2 a4", "d1 d2", 4, toplay))
+        boards.append(setup("b1 b2 b3 b4 a2 a4", "d1 d3 c2", 4, toplay))
+        boards.append(setup("a2 b1 b2 c2 c1 e2 e1 d2", "a4 b4 c4 d4 e4 a5", 5, toplay))
+    return boards + random_positions(5, 8, 20, seed=37)
+
+
+class TempoTest(unittest.TestCase):
+    def test_equivalent_fills(self):
+        pairs = 0
+        for board in positions():
+            color = board.current_player
+            classes = {}
+            for point in board.get_empty_points():
+                if board.is_legal(point, color):
+                    key = board.tempo_class(point, color)
+                    if key is not None:
+                        classes.setdefault(key, []).append(point)
+            for moves in classes.values():
+                values = {wins_with(board, move) for move in moves}
+                self.assertEqual(len(values), 1)
+                pairs += len(moves) - 1
+        self.assertGreaterEqual(pairs, 3)
+
+    def test_solve(self):
+        for board in positions():
+            expected = brute_force(board)
+            for use_tempo in (True, False):
+                win, move = solve(board, use_tempo=use_tempo)
+                self.assertEqual(win, expected)
+                if win:
+                    self.assertTrue(wins_with(board, move))
+
+
+if __name__ == "__main__":
+    unittest.main()